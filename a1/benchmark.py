@@ -0,0 +1,298 @@
+# Benchmarks for the bandit algorithms
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from util.bandit_builder import BanditBuilder
+
+
+def run_pullers(build_puller, num_arms, num_rounds, num_trials, seed):
+    for i in range(num_trials):
+        bandit = BanditBuilder(num_arms, seed + i)
+        puller = build_puller(num_arms, seed + i)
+        for _ in range(num_rounds):
+            picked_arm = puller.choose_action()
+            value, rank = bandit.pull_arm(picked_arm)
+            puller.log_action(picked_arm, value, rank)
+    return num_rounds * num_trials
+
+
+def bench_ucb(num_arms, num_rounds, num_trials, seed):
+    from ucb import UCBBanditPuller
+
+    return run_pullers(
+        lambda k, _: UCBBanditPuller(k, 1), num_arms, num_rounds, num_trials, seed
+    )
+
+
+def bench_ucb_indexed(num_arms, num_rounds, num_trials, seed):
+    from ucb import IndexedUCBBanditPuller
+
+    return run_pullers(
+        lambda k, _: IndexedUCBBanditPuller(k, 1),
+        num_arms,
+        num_rounds,
+        num_trials,
+        seed,
+    )
+
+
+def bench_ucb_batched(num_arms, num_rounds, num_trials, seed):
+    from util.batched_ucb import run_batched_trials
+    from util.data_calculator import DataCalculator
+
+    run_batched_trials(
+        DataCalculator(num_arms, num_rounds),
+        num_trials,
+        num_arms,
+        num_rounds,
+        seed,
+        1,
+    )
+    return num_rounds * num_trials
+
+
+def bench_lri(num_arms, num_rounds, num_trials, seed):
+    from learning_automata import LinearRewardBanditPuller
+
+    return run_pullers(
+        lambda k, s: LinearRewardBanditPuller(k, 0.01, 0, s),
+        num_arms,
+        num_rounds,
+        num_trials,
+        seed,
+    )
+
+
+def bench_lrp(num_arms, num_rounds, num_trials, seed):
+    from learning_automata import LinearRewardBanditPuller
+
+    return run_pullers(
+        lambda k, s: LinearRewardBanditPuller(k, 0.01, 0.01, s),
+        num_arms,
+        num_rounds,
+        num_trials,
+        seed,
+    )
+
+
+def bench_lrp_tree(num_arms, num_rounds, num_trials, seed):
+    from learning_automata import TreeLinearRewardBanditPuller
+
+    return run_pullers(
+        lambda k, s: TreeLinearRewardBanditPuller(k, 0.01, 0.01, s),
+        num_arms,
+        num_rounds,
+        num_trials,
+        seed,
+    )
+
+
+def bench_q1_ucb(num_arms, num_rounds, num_trials, seed):
+    from q1 import run_ucb_many_envs
+
+    run_ucb_many_envs(runs=num_trials, k=num_arms, steps=num_rounds, seed=seed)
+    return num_rounds * num_trials
+
+
+def bench_q1_ucb_vectorized(num_arms, num_rounds, num_trials, seed):
+    from q1 import run_ucb_many_envs_vectorized
+
+    run_ucb_many_envs_vectorized(
+        runs=num_trials, k=num_arms, steps=num_rounds, seed=seed
+    )
+    return num_rounds * num_trials
+
+
+def bench_q2(algo, vectorized, num_arms, num_rounds, num_trials, seed):
+    from q2 import (
+        run_many_envs_learning_automaton,
+        run_many_envs_learning_automaton_vectorized,
+    )
+
+    run = (
+        run_many_envs_learning_automaton_vectorized
+        if vectorized
+        else run_many_envs_learning_automaton
+    )
+    run(algo=algo, runs=num_trials, k=num_arms, steps=num_rounds, seed=seed)
+    return num_rounds * num_trials
+
+
+def bench_q2_lri(num_arms, num_rounds, num_trials, seed):
+    return bench_q2("LRI", False, num_arms, num_rounds, num_trials, seed)
+
+
+def bench_q2_lrp(num_arms, num_rounds, num_trials, seed):
+    return bench_q2("LRP", False, num_arms, num_rounds, num_trials, seed)
+
+
+def bench_q2_lri_vectorized(num_arms, num_rounds, num_trials, seed):
+    return bench_q2("LRI", True, num_arms, num_rounds, num_trials, seed)
+
+
+def bench_q2_lrp_vectorized(num_arms, num_rounds, num_trials, seed):
+    return bench_q2("LRP", True, num_arms, num_rounds, num_trials, seed)
+
+
+BENCHMARKS = {
+    "ucb": bench_ucb,
+    "ucb_indexed": bench_ucb_indexed,
+    "ucb_batched": bench_ucb_batched,
+    "lri": bench_lri,
+    "lrp": bench_lrp,
+    "lrp_tree": bench_lrp_tree,
+    "q1_ucb": bench_q1_ucb,
+    "q1_ucb_vectorized": bench_q1_ucb_vectorized,
+    "q2_lri": bench_q2_lri,
+    "q2_lrp": bench_q2_lrp,
+    "q2_lri_vectorized": bench_q2_lri_vectorized,
+    "q2_lrp_vectorized": bench_q2_lrp_vectorized,
+}
+
+# the modules each case imports, numpy included for the vectorized notebook
+# functions that import it themselves. they are loaded before the timer starts
+BENCHMARK_MODULES = {
+    "ucb": ["ucb"],
+    "ucb_indexed": ["ucb"],
+    "ucb_batched": ["util.batched_ucb", "util.data_calculator"],
+    "lri": ["learning_automata"],
+    "lrp": ["learning_automata"],
+    "lrp_tree": ["learning_automata"],
+    "q1_ucb": ["q1"],
+    "q1_ucb_vectorized": ["q1", "numpy"],
+    "q2_lri": ["q2"],
+    "q2_lrp": ["q2"],
+    "q2_lri_vectorized": ["q2", "numpy"],
+    "q2_lrp_vectorized": ["q2", "numpy"],
+}
+
+
+# runs in a fresh process so that the peak memory belongs to this case only
+def run_case(name, num_arms, num_rounds, num_trials, seed):
+    result = {
+        "algorithm": name,
+        "arms": num_arms,
+        "rounds": num_rounds,
+        "trials": num_trials,
+    }
+    try:
+        for module in BENCHMARK_MODULES[name]:
+            importlib.import_module(module)
+        start = time.perf_counter()
+        pulls = BENCHMARKS[name](num_arms, num_rounds, num_trials, seed)
+        wall_time = time.perf_counter() - start
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    # linux reports kilobytes, macos reports bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak //= 1024
+
+    result["pulls"] = pulls
+    result["wall_time"] = wall_time
+    result["pulls_per_second"] = pulls / wall_time if wall_time > 0 else None
+    result["peak_memory_kb"] = peak
+    return result
+
+
+def compare_results(results, previous_path):
+    with open(previous_path) as file:
+        previous = json.load(file)["results"]
+    previous_speed = {
+        (r["algorithm"], r["arms"], r["rounds"], r["trials"]): r.get("pulls_per_second")
+        for r in previous
+    }
+
+    print()
+    print(f"COMPARED TO {previous_path}")
+    print("-" * 70)
+    for result in results:
+        key = (result["algorithm"], result["arms"], result["rounds"], result["trials"])
+        old = previous_speed.get(key)
+        new = result.get("pulls_per_second")
+        if old and new:
+            print(
+                f"{key[0]:<18} | {key[1]:<8} | {key[2]:<8} | {key[3]:<6} | {new / old:.2f}x"
+            )
+
+
+def main(args):
+    mp_context = multiprocessing.get_context("spawn")
+    results = []
+
+    print(
+        f"{'Algorithm':<18} | {'Arms':<8} | {'Rounds':<8} | {'Trials':<6} | {'Pulls/s':<12} | {'Wall (s)':<9} | {'Peak (KB)':<10}"
+    )
+    print("-" * 88)
+    for name in args.algorithms:
+        for num_arms in args.arms:
+            for num_rounds in args.rounds:
+                for num_trials in args.trials:
+                    with ProcessPoolExecutor(1, mp_context=mp_context) as executor:
+                        result = executor.submit(
+                            run_case, name, num_arms, num_rounds, num_trials, args.seed
+                        ).result()
+                    results.append(result)
+
+                    if "error" in result:
+                        print(
+                            f"{name:<18} | {num_arms:<8} | {num_rounds:<8} | {num_trials:<6} | {result['error']}"
+                        )
+                    else:
+                        print(
+                            f"{name:<18} | {num_arms:<8} | {num_rounds:<8} | {num_trials:<6} | {result['pulls_per_second']:<12.0f} | {result['wall_time']:<9.3f} | {result['peak_memory_kb']:<10}"
+                        )
+
+    with open(args.output, "w") as file:
+        json.dump(
+            {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "seed": args.seed,
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+    print()
+    print(f"results saved to {args.output}")
+
+    if args.compare is not None:
+        compare_results(results, args.compare)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandit Algorithm Benchmarks")
+    parser.add_argument(
+        "--algorithms",
+        type=str,
+        nargs="+",
+        choices=list(BENCHMARKS),
+        default=list(BENCHMARKS),
+    )
+    parser.add_argument("--arms", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--trials", type=int, nargs="+", default=[10])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, default="benchmark_results.json")
+    parser.add_argument(
+        "--compare",
+        type=str,
+        default=None,
+        help="Previous results file to compare pulls per second against",
+    )
+
+    args = parser.parse_args()
+    main(args)
@@ -4,11 +4,26 @@ import argparse
 import random
 from util.data_calculator import DataCalculator
 from util.bandit_builder import BanditBuilder
-from util.functions import calculate_running_average, plot_results
+from util.functions import (
+    PLOT_MODES,
+    calculate_running_average,
+    close_plots,
+    plot_results,
+    set_plot_mode,
+)
+from util.probability_tree import ProbabilityTree
 
 
 class LinearRewardBanditPuller:
-    def __init__(self, num_actions, reward_rate, penalty_rate, seed=None):
+    def __init__(
+        self,
+        num_actions,
+        reward_rate,
+        penalty_rate,
+        seed=None,
+        record_stride=1,
+        sink=None,
+    ):
         self.rng = random.Random(seed) if seed else random.Random()
 
         self.num_actions = num_actions
@@ -18,6 +33,9 @@ class LinearRewardBanditPuller:
         self.total_pulls = 0
         self.average_reward = 0
 
+        # only every record_stride rounds is kept in the record and sent to the sink
+        self.record_stride = record_stride
+        self.sink = sink
         self.record = []
         self.pull_record = [0 for _ in range(num_actions)]
 
@@ -43,7 +61,14 @@ class LinearRewardBanditPuller:
                 self.average_reward, 0, self.total_pulls
             )
             self.log_failure(action)
+        self.log_record()
+
+    def log_record(self):
+        if self.total_pulls % self.record_stride != 0:
+            return
         self.record.append(self.average_reward)
+        if self.sink is not None:
+            self.sink(self.total_pulls, self.average_reward, self.pull_record[0])
 
     def log_success(self, action):
         for i in range(self.num_actions):
@@ -66,28 +91,157 @@ class LinearRewardBanditPuller:
             self.actions[i] = new_prob
 
 
+class TreeLinearRewardBanditPuller(LinearRewardBanditPuller):
+    # same updates as LinearRewardBanditPuller, but the probabilities live in a
+    # ProbabilityTree so that an update only touches the chosen arm and the global
+    # scale, and choosing an arm is a tree descent instead of a linear scan
+    def __init__(
+        self,
+        num_actions,
+        reward_rate,
+        penalty_rate,
+        seed=None,
+        record_stride=1,
+        sink=None,
+    ):
+        super().__init__(
+            num_actions, reward_rate, penalty_rate, seed, record_stride, sink
+        )
+        self.actions = ProbabilityTree(self.actions)
+
+    def choose_action(self):
+        return self.actions.sample(self.rng.random())
+
+    def log_success(self, action):
+        # every probability is scaled by (1 - reward_rate) and the chosen one also
+        # gains reward_rate
+        self.actions.scale_all(1 - self.reward_rate)
+        self.actions.add(action, self.reward_rate)
+
+    def log_failure(self, action):
+        if self.penalty_rate == 0:
+            return
+        self.actions.scale_all(1 - self.penalty_rate)
+        self.actions.add(action, self.penalty_rate / (self.num_actions - 1))
+
+
 def main(args):
+    set_plot_mode(args.plot, args.plot_dir)
 
-    inaction_calculator = DataCalculator(args.num_arms, args.num_rounds)
-    penalty_calculator = DataCalculator(args.num_arms, args.num_rounds)
+    if args.accumulate:
+        from util.trial_accumulator import TrialAccumulator
+
+        memmap_path = args.memmap_path
+        inaction_calculator = TrialAccumulator(
+            args.num_arms,
+            args.num_rounds,
+            args.num_trials,
+            f"{memmap_path}_inaction" if memmap_path else None,
+        )
+        penalty_calculator = TrialAccumulator(
+            args.num_arms,
+            args.num_rounds,
+            args.num_trials,
+            f"{memmap_path}_penalty" if memmap_path else None,
+        )
+    else:
+        inaction_calculator = DataCalculator(args.num_arms, args.num_rounds)
+        penalty_calculator = DataCalculator(args.num_arms, args.num_rounds)
 
     # want to control the seed but also have a different see for each trial
     rng = random.Random(args.seed)
     init_seed = rng.randint(1, 100)
 
+    if args.workers > 1:
+        from util.parallel_trials import run_parallel_trials
+
+        run_parallel_trials(
+            run_trial, args, init_seed, [inaction_calculator, penalty_calculator]
+        )
+    else:
+        run_trials(inaction_calculator, penalty_calculator, args, init_seed)
+
+    print_results(args, inaction_calculator, penalty_calculator)
+    close_plots()
+
+
+def build_bandit(args, trial_seed):
+    if args.array_bandit:
+        from util.array_bandit import ArrayBandit
+
+        return ArrayBandit(args.num_arms, trial_seed)
+    return BanditBuilder(args.num_arms, trial_seed)
+
+
+def build_pullers(args, trial_seed, sink=None, trial=0):
+    puller_class = (
+        TreeLinearRewardBanditPuller if args.tree else LinearRewardBanditPuller
+    )
+    inaction_puller = puller_class(
+        args.num_arms,
+        args.reward_rate,
+        0,
+        trial_seed,
+        args.record_stride,
+        sink.channel(trial, 0) if sink else None,
+    )
+    penalty_puller = puller_class(
+        args.num_arms,
+        args.reward_rate,
+        args.penalty_rate,
+        trial_seed,
+        args.record_stride,
+        sink.channel(trial, 1) if sink else None,
+    )
+    return inaction_puller, penalty_puller
+
+
+# run one full trial without printing, used by the worker processes
+def run_trial(args, trial_seed):
+    bandit = build_bandit(args, trial_seed)
+    inaction_puller, penalty_puller = build_pullers(args, trial_seed)
+
+    i_values = []
+    p_values = []
+    i_ranks = []
+    p_ranks = []
+    for _ in range(args.num_rounds):
+        i_picked_arm = inaction_puller.choose_action()
+        p_picked_arm = penalty_puller.choose_action()
+
+        i_value, i_rank = bandit.pull_arm(i_picked_arm)
+        p_value, p_rank = bandit.pull_arm(p_picked_arm)
+
+        inaction_puller.log_action(i_picked_arm, i_value, i_rank)
+        penalty_puller.log_action(p_picked_arm, p_value, p_rank)
+
+        i_values.append(inaction_puller.average_reward)
+        p_values.append(penalty_puller.average_reward)
+        i_ranks.append(i_rank)
+        p_ranks.append(p_rank)
+
+    optimal_value = bandit.get_expected_value(bandit.get_optimal_action())
+    return [
+        (optimal_value, bandit.sorted_values, i_values, i_ranks),
+        (optimal_value, bandit.sorted_values, p_values, p_ranks),
+    ]
+
+
+def run_trials(inaction_calculator, penalty_calculator, args, init_seed):
+    sink = None
+    if args.record_path is not None:
+        from util.metric_sink import MetricSink
+
+        sink = MetricSink(args.record_path, args.record_format)
+
     for i in range(args.num_trials):
         print()
         print()
         print(f"TRIAL {i+1}")
 
         trial_seed = init_seed + i
-        bandit = BanditBuilder(args.num_arms, trial_seed)
-        inaction_puller = LinearRewardBanditPuller(
-            args.num_arms, args.reward_rate, 0, trial_seed
-        )
-        penalty_puller = LinearRewardBanditPuller(
-            args.num_arms, args.reward_rate, args.penalty_rate, trial_seed
-        )
+        bandit = build_bandit(args, trial_seed)
+        inaction_puller, penalty_puller = build_pullers(args, trial_seed, sink, i)
 
         optimal_value = bandit.get_expected_value(bandit.get_optimal_action())
         optimal_record = [optimal_value for _ in range(1, args.num_rounds + 1)]
@@ -98,6 +252,10 @@ def main(args):
         inaction_calculator.update_average_pull_values(bandit.sorted_values, i)
         penalty_calculator.update_average_pull_values(bandit.sorted_values, i)
 
+        i_values = []
+        p_values = []
+        i_ranks = []
+        p_ranks = []
         for j in range(args.num_rounds):
             i_picked_arm = inaction_puller.choose_action()
             p_picked_arm = penalty_puller.choose_action()
@@ -108,11 +266,17 @@ def main(args):
             inaction_puller.log_action(i_picked_arm, i_value, i_rank)
             penalty_puller.log_action(p_picked_arm, p_value, p_rank)
 
-            inaction_calculator.update_value(inaction_puller.record[j], j)
-            penalty_calculator.update_value(penalty_puller.record[j], j)
+            if args.accumulate:
+                i_values.append(inaction_puller.average_reward)
+                p_values.append(penalty_puller.average_reward)
+                i_ranks.append(i_rank)
+                p_ranks.append(p_rank)
+            else:
+                inaction_calculator.update_value(inaction_puller.average_reward, j)
+                penalty_calculator.update_value(penalty_puller.average_reward, j)
 
-            inaction_calculator.update_pull_record(inaction_puller.pull_record, j)
-            penalty_calculator.update_pull_record(penalty_puller.pull_record, j)
+                inaction_calculator.update_pull_record(inaction_puller.pull_record, j)
+                penalty_calculator.update_pull_record(penalty_puller.pull_record, j)
 
             if (j + 1) % 100 == 0:
                 print(
@@ -131,6 +295,19 @@ def main(args):
             f"Optimal Expected Value: {bandit.get_expected_value(bandit.get_optimal_action())}"
         )
 
+        if args.accumulate:
+            inaction_calculator.record_trial(i_values, i_ranks)
+            penalty_calculator.record_trial(p_values, p_ranks)
+
+    if sink is not None:
+        sink.close()
+
+    if args.accumulate:
+        inaction_calculator.reduce()
+        penalty_calculator.reduce()
+
+
+def print_results(args, inaction_calculator, penalty_calculator):
     print()
     print("FINAL RESULTS")
     print("-" * 50)
@@ -143,6 +320,11 @@ def main(args):
     print(
         f"Final Average Value R-P: {penalty_calculator.total_optimal_value_record[-1]}"
     )
+    if args.accumulate:
+        i_low, i_high = inaction_calculator.confidence_band()
+        p_low, p_high = penalty_calculator.confidence_band()
+        print(f"Final Value 95% Band R-I: [{i_low[-1]:.6f}, {i_high[-1]:.6f}]")
+        print(f"Final Value 95% Band R-P: [{p_low[-1]:.6f}, {p_high[-1]:.6f}]")
     print("-" * 50)
     print(
         f"{'Pulled Arm':<10} | {'Inaction Percentage Pulled':<26} | {'Penalty Percentage Pulled':<25} | {'Average Value':<13}"
@@ -230,6 +412,59 @@ if __name__ == "__main__":
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--reward_rate", type=float, default=0.01)
     parser.add_argument("--penalty_rate", type=float, default=0.01)
+    parser.add_argument(
+        "--accumulate",
+        action="store_true",
+        help="Store every trial in a numpy array and reduce at the end",
+    )
+    parser.add_argument(
+        "--memmap_path",
+        type=str,
+        default=None,
+        help="File prefix for memory mapping the --accumulate arrays",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes to run the trials on",
+    )
+    parser.add_argument(
+        "--tree",
+        action="store_true",
+        help="Store the probabilities in a tree, for large numbers of arms",
+    )
+    parser.add_argument(
+        "--array_bandit",
+        action="store_true",
+        help="Store the bandit arms in compact arrays, for large arm counts",
+    )
+    parser.add_argument(
+        "--record_stride",
+        type=int,
+        default=1,
+        help="Only record the average reward every this many rounds",
+    )
+    parser.add_argument(
+        "--record_path",
+        type=str,
+        default=None,
+        help="File to stream the recorded rounds to while running, serial runs only",
+    )
+    parser.add_argument(
+        "--record_format", type=str, choices=["csv", "bin"], default="csv"
+    )
+    parser.add_argument(
+        "--plot",
+        type=str,
+        choices=PLOT_MODES,
+        default="show",
+        help="Show the plots, save them to --plot_dir in the background, or skip them",
+    )
+    parser.add_argument("--plot_dir", type=str, default="plots")
 
     args = parser.parse_args()
+    # the recorded rounds are only streamed from the serial trial loop
+    if args.record_path is not None and args.workers > 1:
+        parser.error("--record_path can't be used with --workers")
     main(args)
@@ -1,21 +1,21 @@
 # -*- coding: utf-8 -*-
-"""Q1.ipynb
+"""Q1.ipynb"""
 
-import random
+import argparse
 import math
-import time
+import random
 
-random.seed(time.time())
 
-def make_environment(k=10):
-    q = [random.random() for _ in range(k)]  # numbers in [0, 1)
+def make_environment(k=10, rng=random):
+    q = [rng.random() for _ in range(k)]  # numbers in [0, 1)
 
     optimal_action = max(range(k), key=lambda i: q[i])
 
     return q, optimal_action
 
-def pull_arm(q, action):
-    return 1 if random.random() < q[action] else 0
+
+def pull_arm(q, action, rng=random):
+    return 1 if rng.random() < q[action] else 0
 
 
 def choose_action_ucb(Q, N, t, c=2.0):
@@ -38,7 +38,10 @@ def choose_action_ucb(Q, N, t, c=2.0):
 
     return best_a
 
-def run_ucb_many_envs(runs=100, k=10, steps=5000, c=2.0):
+
+def run_ucb_many_envs(runs=100, k=10, steps=5000, c=2.0, seed=None):
+    rng = random.Random(seed)
+
     num_checkpoints = steps // 100
     checkpoints = [(i + 1) * 100 for i in range(num_checkpoints)]
 
@@ -46,7 +49,7 @@ def run_ucb_many_envs(runs=100, k=10, steps=5000, c=2.0):
     sum_avg_reward = [0.0] * num_checkpoints
 
     for _ in range(runs):
-        q, optimal_action = make_environment(k)
+        q, optimal_action = make_environment(k, rng)
 
         Q = [0.0] * k
         N = [0] * k
@@ -56,7 +59,7 @@ def run_ucb_many_envs(runs=100, k=10, steps=5000, c=2.0):
         cp_idx = 0
         for t in range(1, steps + 1):
             action = choose_action_ucb(Q, N, t, c=c)
-            reward = pull_arm(q, action)
+            reward = pull_arm(q, action, rng)
 
             total_reward += reward
             if action == optimal_action:
@@ -67,7 +70,7 @@ def run_ucb_many_envs(runs=100, k=10, steps=5000, c=2.0):
 
             if t % 100 == 0:
                 sum_opt_count[cp_idx] += optimal_count
-                sum_avg_reward[cp_idx] += (total_reward / t)
+                sum_avg_reward[cp_idx] += total_reward / t
                 cp_idx += 1
 
     avg_opt_count = [x / runs for x in sum_opt_count]
@@ -75,31 +78,102 @@ def run_ucb_many_envs(runs=100, k=10, steps=5000, c=2.0):
 
     return checkpoints, avg_opt_count, avg_reward
 
-checkpoints, avg_opt_count, avg_reward = run_ucb_many_envs(
-    runs=100, k=10, steps=5000, c=2.0
-)
-
-import matplotlib.pyplot as plt
-
-avg_opt_percent = [
-    (avg_opt_count[i] / checkpoints[i]) * 100
-    for i in range(len(checkpoints))
-]
-
-# Plot 1: Average reward vs time
-plt.figure()
-plt.plot(checkpoints, avg_reward)
-plt.xlabel("Time step (t)")
-plt.ylabel("Average reward")
-plt.title("UCB: Average Reward vs Time (100 environments)")
-plt.grid(True)
-plt.show()
-
-# Plot 2: Optimal action selection percentage
-plt.figure()
-plt.plot(checkpoints, avg_opt_percent)
-plt.xlabel("Time step (t)")
-plt.ylabel("Optimal action chosen (%)")
-plt.title("UCB: Optimal Action Selection vs Time (100 environments)")
-plt.grid(True)
-plt.show()
+
+# same experiment as run_ucb_many_envs, but every run is a row of a numpy array and
+# all the runs take each step together. the random numbers come from a numpy
+# generator, so the results match the loop version statistically but not exactly
+def run_ucb_many_envs_vectorized(runs=100, k=10, steps=5000, c=2.0, seed=None):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+
+    num_checkpoints = steps // 100
+    checkpoints = [(i + 1) * 100 for i in range(num_checkpoints)]
+
+    sum_opt_count = np.zeros(num_checkpoints)
+    sum_avg_reward = np.zeros(num_checkpoints)
+
+    q = rng.random((runs, k))
+    optimal_action = q.argmax(axis=1)
+    rows = np.arange(runs)
+
+    Q = np.zeros((runs, k))
+    N = np.zeros((runs, k), dtype=np.int64)
+    total_reward = np.zeros(runs)
+    optimal_count = np.zeros(runs, dtype=np.int64)
+
+    cp_idx = 0
+    for t in range(1, steps + 1):
+        # every run tries each arm once in order before using the bonus
+        if t <= k:
+            action = np.full(runs, t - 1)
+        else:
+            score = Q + c * np.sqrt(math.log(t) / N)
+            action = score.argmax(axis=1)
+        reward = (rng.random(runs) < q[rows, action]).astype(np.float64)
+
+        total_reward += reward
+        optimal_count += action == optimal_action
+
+        N[rows, action] += 1
+        Q[rows, action] += (1.0 / N[rows, action]) * (reward - Q[rows, action])
+
+        if t % 100 == 0:
+            sum_opt_count[cp_idx] = optimal_count.sum()
+            sum_avg_reward[cp_idx] = (total_reward / t).sum()
+            cp_idx += 1
+
+    avg_opt_count = (sum_opt_count / runs).tolist()
+    avg_reward = (sum_avg_reward / runs).tolist()
+
+    return checkpoints, avg_opt_count, avg_reward
+
+
+def main(args):
+    run = run_ucb_many_envs_vectorized if args.vectorized else run_ucb_many_envs
+    checkpoints, avg_opt_count, avg_reward = run(
+        runs=args.runs, k=args.k, steps=args.steps, c=args.c, seed=args.seed
+    )
+
+    avg_opt_percent = [
+        (avg_opt_count[i] / checkpoints[i]) * 100 for i in range(len(checkpoints))
+    ]
+    print(f"Final average reward: {avg_reward[-1]}")
+    print(f"Final optimal action chosen: {avg_opt_percent[-1]}%")
+
+    if args.no_plot:
+        return
+
+    import matplotlib.pyplot as plt
+
+    # Plot 1: Average reward vs time
+    plt.figure()
+    plt.plot(checkpoints, avg_reward)
+    plt.xlabel("Time step (t)")
+    plt.ylabel("Average reward")
+    plt.title(f"UCB: Average Reward vs Time ({args.runs} environments)")
+    plt.grid(True)
+    plt.show()
+
+    # Plot 2: Optimal action selection percentage
+    plt.figure()
+    plt.plot(checkpoints, avg_opt_percent)
+    plt.xlabel("Time step (t)")
+    plt.ylabel("Optimal action chosen (%)")
+    plt.title(f"UCB: Optimal Action Selection vs Time ({args.runs} environments)")
+    plt.grid(True)
+    plt.show()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Q1 UCB Notebook")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--c", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--vectorized", action="store_true")
+    parser.add_argument("--no_plot", action="store_true")
+
+    args = parser.parse_args()
+    main(args)
@@ -1,19 +1,19 @@
 # -*- coding: utf-8 -*-
-"""Q2.ipynb
+"""Q2.ipynb"""
 
+import argparse
 import random
-import math
-import time
-import matplotlib.pyplot as plt
-random.seed(time.time())
 
-def make_environment(k=10):
-    q = [random.random() for _ in range(k)]
+
+def make_environment(k=10, rng=random):
+    q = [rng.random() for _ in range(k)]
     optimal_action = max(range(k), key=lambda i: q[i])
     return q, optimal_action
 
-def pull_arm(q, action):
-    return 1 if random.random() < q[action] else 0
+
+def pull_arm(q, action, rng=random):
+    return 1 if rng.random() < q[action] else 0
+
 
 def update_lr_p(p, chosen, reward, alpha=0.1, beta=0.1):
     k = len(p)
@@ -32,6 +32,7 @@ def update_lr_p(p, chosen, reward, alpha=0.1, beta=0.1):
                 p[j] = (beta / (k - 1)) + (1 - beta) * p[j]
     return p
 
+
 def update_lr_i(p, chosen, reward, alpha=0.1):
     if reward == 1:
         k = len(p)
@@ -42,13 +43,15 @@ def update_lr_i(p, chosen, reward, alpha=0.1):
                 p[j] = (1 - alpha) * p[j]
     return p
 
-def choose_action_from_p(p):
-    return random.choices(range(len(p)), weights=p, k=1)[0]
+
+def choose_action_from_p(p, rng=random):
+    return rng.choices(range(len(p)), weights=p, k=1)[0]
+
 
 def run_learning_automaton_one_env(
-    algo="LRP", k=10, steps=5000, alpha=0.1, beta=0.1, verbose=False
+    algo="LRP", k=10, steps=5000, alpha=0.1, beta=0.1, verbose=False, rng=random
 ):
-    q, optimal_action = make_environment(k)
+    q, optimal_action = make_environment(k, rng)
 
     p = [1.0 / k] * k
 
@@ -60,8 +63,8 @@ def run_learning_automaton_one_env(
     avg_rewards = []
 
     for t in range(1, steps + 1):
-        action = choose_action_from_p(p)
-        reward = pull_arm(q, action)
+        action = choose_action_from_p(p, rng)
+        reward = pull_arm(q, action, rng)
 
         total_reward += reward
         if action == optimal_action:
@@ -83,16 +86,18 @@ def run_learning_automaton_one_env(
             avg_rewards.append(avg_r)
 
             if verbose:
-                print(f"{algo}  t={t:4d}  optimal={optimal_count:4d}  avg_reward={avg_r:.4f}")
+                print(
+                    f"{algo}  t={t:4d}  optimal={optimal_count:4d}  avg_reward={avg_r:.4f}"
+                )
 
     return checkpoints, opt_counts, avg_rewards
 
-cp, opt_counts, avg_rewards = run_learning_automaton_one_env(algo="LRI", verbose=True)
-print("Done. Last avg reward:", avg_rewards[-1])
 
 def run_many_envs_learning_automaton(
-    algo="LRP", runs=100, k=10, steps=5000, alpha=0.1, beta=0.1
+    algo="LRP", runs=100, k=10, steps=5000, alpha=0.1, beta=0.1, seed=None
 ):
+    rng = random.Random(seed)
+
     num_checkpoints = steps // 100
     checkpoints = [(i + 1) * 100 for i in range(num_checkpoints)]
 
@@ -101,7 +106,7 @@ def run_many_envs_learning_automaton(
 
     for _ in range(runs):
         cp, opt_counts, avg_rewards = run_learning_automaton_one_env(
-            algo=algo, k=k, steps=steps, alpha=alpha, beta=beta, verbose=False
+            algo=algo, k=k, steps=steps, alpha=alpha, beta=beta, verbose=False, rng=rng
         )
 
         for i in range(num_checkpoints):
@@ -110,52 +115,162 @@ def run_many_envs_learning_automaton(
 
     avg_opt = [x / runs for x in sum_opt]
     avg_reward = [x / runs for x in sum_avg_reward]
-    avg_opt_percent = [(avg_opt[i] / checkpoints[i]) * 100 for i in range(num_checkpoints)]
+    avg_opt_percent = [
+        (avg_opt[i] / checkpoints[i]) * 100 for i in range(num_checkpoints)
+    ]
+
+    return checkpoints, avg_opt, avg_opt_percent, avg_reward
+
+
+# same experiment as run_many_envs_learning_automaton, but every run is a row of a
+# numpy array and all the runs take each step together. the random numbers come
+# from a numpy generator, so the results match the loop version statistically but
+# not exactly
+def run_many_envs_learning_automaton_vectorized(
+    algo="LRP", runs=100, k=10, steps=5000, alpha=0.1, beta=0.1, seed=None
+):
+    import numpy as np
+
+    if algo.upper() not in ("LRP", "LRI"):
+        raise ValueError("algo must be 'LRP' or 'LRI'")
+    is_lrp = algo.upper() == "LRP"
+
+    rng = np.random.default_rng(seed)
+
+    num_checkpoints = steps // 100
+    checkpoints = [(i + 1) * 100 for i in range(num_checkpoints)]
+
+    sum_opt = np.zeros(num_checkpoints)
+    sum_avg_reward = np.zeros(num_checkpoints)
+
+    q = rng.random((runs, k))
+    optimal_action = q.argmax(axis=1)
+    rows = np.arange(runs)
+
+    p = np.full((runs, k), 1.0 / k)
+    total_reward = np.zeros(runs)
+    optimal_count = np.zeros(runs, dtype=np.int64)
+
+    cp_idx = 0
+    for t in range(1, steps + 1):
+        # sample every run's action from its own probabilities at once
+        choice = rng.random(runs)[:, None] * p.sum(axis=1, keepdims=True)
+        action = np.minimum((p.cumsum(axis=1) <= choice).sum(axis=1), k - 1)
+        reward = rng.random(runs) < q[rows, action]
+
+        total_reward += reward
+        optimal_count += action == optimal_action
+
+        # Update probabilities
+        won = rows[reward]
+        chosen = action[reward]
+        p[won] *= 1 - alpha
+        p[won, chosen] += alpha
+        if is_lrp:
+            lost = rows[~reward]
+            chosen = action[~reward]
+            p[lost] = beta / (k - 1) + (1 - beta) * p[lost]
+            p[lost, chosen] -= beta / (k - 1)
+
+        if t % 100 == 0:
+            sum_opt[cp_idx] = optimal_count.sum()
+            sum_avg_reward[cp_idx] = (total_reward / t).sum()
+            cp_idx += 1
+
+    avg_opt = (sum_opt / runs).tolist()
+    avg_reward = (sum_avg_reward / runs).tolist()
+    avg_opt_percent = [
+        (avg_opt[i] / checkpoints[i]) * 100 for i in range(num_checkpoints)
+    ]
 
     return checkpoints, avg_opt, avg_opt_percent, avg_reward
 
-runs = 100
-steps = 5000
-k = 10
-
-alpha = 0.1
-beta = 0.1
-
-# LR-I results
-cp, lri_opt, lri_opt_pct, lri_avg = run_many_envs_learning_automaton(
-    algo="LRI", runs=runs, k=k, steps=steps, alpha=alpha, beta=beta
-)
-
-# LR-P results
-cp, lrp_opt, lrp_opt_pct, lrp_avg = run_many_envs_learning_automaton(
-    algo="LRP", runs=runs, k=k, steps=steps, alpha=alpha, beta=beta
-)
-
-print("Done running LR-I and LR-P.")
-print("Example: first checkpoint =", cp[0],
-      "LR-I avg reward =", round(lri_avg[0], 4),
-      "LR-P avg reward =", round(lrp_avg[0], 4))
-
-import matplotlib.pyplot as plt
-
-# Plot 1: Average reward vs time
-plt.figure()
-plt.plot(cp, lri_avg, label="LR-I")
-plt.plot(cp, lrp_avg, label="LR-P")
-plt.xlabel("Time step (t)")
-plt.ylabel("Average reward")
-plt.title("Learning Automata: Average Reward vs Time (100 environments)")
-plt.grid(True)
-plt.legend()
-plt.show()
-
-# Plot 2: Optimal action selection (%)
-plt.figure()
-plt.plot(cp, lri_opt_pct, label="LR-I")
-plt.plot(cp, lrp_opt_pct, label="LR-P")
-plt.xlabel("Time step (t)")
-plt.ylabel("Optimal action chosen (%)")
-plt.title("Learning Automata: Optimal Action Selection vs Time (100 environments)")
-plt.grid(True)
-plt.legend()
-plt.show()
+
+def main(args):
+    rng = random.Random(args.seed)
+    cp, opt_counts, avg_rewards = run_learning_automaton_one_env(
+        algo="LRI", verbose=True, rng=rng
+    )
+    print("Done. Last avg reward:", avg_rewards[-1])
+
+    run = (
+        run_many_envs_learning_automaton_vectorized
+        if args.vectorized
+        else run_many_envs_learning_automaton
+    )
+
+    # LR-I results
+    cp, lri_opt, lri_opt_pct, lri_avg = run(
+        algo="LRI",
+        runs=args.runs,
+        k=args.k,
+        steps=args.steps,
+        alpha=args.alpha,
+        beta=args.beta,
+        seed=args.seed,
+    )
+
+    # LR-P results
+    cp, lrp_opt, lrp_opt_pct, lrp_avg = run(
+        algo="LRP",
+        runs=args.runs,
+        k=args.k,
+        steps=args.steps,
+        alpha=args.alpha,
+        beta=args.beta,
+        seed=args.seed,
+    )
+
+    print("Done running LR-I and LR-P.")
+    print(
+        "Example: first checkpoint =",
+        cp[0],
+        "LR-I avg reward =",
+        round(lri_avg[0], 4),
+        "LR-P avg reward =",
+        round(lrp_avg[0], 4),
+    )
+
+    if args.no_plot:
+        return
+
+    import matplotlib.pyplot as plt
+
+    # Plot 1: Average reward vs time
+    plt.figure()
+    plt.plot(cp, lri_avg, label="LR-I")
+    plt.plot(cp, lrp_avg, label="LR-P")
+    plt.xlabel("Time step (t)")
+    plt.ylabel("Average reward")
+    plt.title(f"Learning Automata: Average Reward vs Time ({args.runs} environments)")
+    plt.grid(True)
+    plt.legend()
+    plt.show()
+
+    # Plot 2: Optimal action selection (%)
+    plt.figure()
+    plt.plot(cp, lri_opt_pct, label="LR-I")
+    plt.plot(cp, lrp_opt_pct, label="LR-P")
+    plt.xlabel("Time step (t)")
+    plt.ylabel("Optimal action chosen (%)")
+    plt.title(
+        f"Learning Automata: Optimal Action Selection vs Time ({args.runs} environments)"
+    )
+    plt.grid(True)
+    plt.legend()
+    plt.show()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Q2 Learning Automata Notebook")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--alpha", type=float, default=0.1)
+    parser.add_argument("--beta", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--vectorized", action="store_true")
+    parser.add_argument("--no_plot", action="store_true")
+
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the scripts import util.* from the a1 directory, so the tests run from there too
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,61 @@
+import random
+
+from tic_tac_toe import Player, PlayerType
+from util.policy_evaluator import PolicyEvaluator
+from util.tic_tac_toe_game import BOARD_SQUARES, TicTacToeGame
+from util.value_table import ValueTable
+
+
+# trains a player against RANDOM for a few games, so most states are still unseen
+def train_player(num_games, seed=42):
+    game = TicTacToeGame()
+    player = Player(game, PlayerType.PLAYER, seed, 0.1, 0.1)
+    opponent = Player(game, PlayerType.RANDOM, seed, 0.1, 0.1)
+    while player.total_games < num_games:
+        player_move = player.play_move()
+        game_over = player_move == -1
+        if not game_over:
+            game_over = opponent.play_move(player_move) == -1
+        if game_over:
+            game.clear_board()
+            player.reset_player()
+            opponent.reset_player()
+    return player.states
+
+
+# plays games with the player's own greedy move choice on a frozen copy of its
+# table against a uniformly random opponent, returning the win, draw and loss rates
+def roll_out(states, num_games, seed=7):
+    frozen = ValueTable(states.symmetric, states.values[:])
+    game = TicTacToeGame()
+    player = Player(game, PlayerType.PLAYER, seed, 0.1, 0, states=frozen)
+    rng = random.Random(seed)
+
+    results = [0, 0, 0]
+    for _ in range(num_games):
+        game.clear_board()
+        while True:
+            game.play_move(player.choose_optimal_move(game.get_options()), True)
+            if game.check_is_winning(True):
+                results[0] += 1
+                break
+            if game.check_is_draw():
+                results[1] += 1
+                break
+            game.play_move(rng.choice(BOARD_SQUARES[game.get_options()]), False)
+            if game.check_is_winning(False):
+                results[2] += 1
+                break
+    return [count / num_games for count in results]
+
+
+def test_exact_results_match_a_rollout_of_a_partly_trained_player():
+    states = train_player(20)
+    exact = PolicyEvaluator(states, "RANDOM").evaluate()
+    rollout = roll_out(states, 20000)
+
+    assert abs(sum(exact) - 1) < 1e-9
+    # 20000 games put each rate within about 0.011 of its true value 99.9% of the
+    # time
+    for exact_rate, rollout_rate in zip(exact, rollout):
+        assert abs(exact_rate - rollout_rate) < 0.015
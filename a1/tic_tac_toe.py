@@ -1,10 +1,33 @@
 # John's Implementation
 
 import argparse
+from array import array
 from enum import Enum
+import os
 import random
-from util.tic_tac_toe_game import TicTacToeGame
-from util.functions import calculate_running_average, plot_results
+from util.grid_game import GridGame
+from util.tic_tac_toe_game import (
+    BOARD_SQUARES,
+    COLUMN_MASKS,
+    DIAGONAL_MASKS,
+    MIRROR_MASKS,
+    ROW_MASKS,
+    TicTacToeGame,
+)
+from util.value_table import (
+    OPPONENT_INDEX,
+    PLAYER_INDEX,
+    ValueTable,
+    load_value_table,
+    save_value_table,
+)
+from util.functions import (
+    PLOT_MODES,
+    calculate_running_average,
+    close_plots,
+    plot_results,
+    set_plot_mode,
+)
 
 
 class PlayerType(Enum):
@@ -18,8 +41,20 @@ class PlayerType(Enum):
 
 
 class Player:
+    # whether the matchup should stop once the values stop changing
+    learns = True
+
     def __init__(
-        self, game, player_type, seed=None, learning_rate=0.1, exploring_rate=0.1
+        self,
+        game,
+        player_type,
+        seed=None,
+        learning_rate=0.1,
+        exploring_rate=0.1,
+        symmetric=False,
+        states=None,
+        td_lambda=0,
+        n_step=1,
     ):
         self.rng = random.Random(seed) if seed else random.Random()
 
@@ -28,9 +63,19 @@ class Player:
         self.exploring_rate = exploring_rate
         self.game = game
 
-        self.states = {}
+        # players can be handed the same table to learn from both sides
+        self.states = states if states is not None else ValueTable(symmetric)
         self.prev_state = 0
 
+        # with td(lambda) or n step returns every slot the player moved to this game
+        # is kept in order, along with the first one still waiting for its n step
+        # return and the value of the last state reached
+        self.td_lambda = td_lambda
+        self.n_step = n_step
+        self.visited = array("l") if td_lambda or n_step > 1 else None
+        self.next_backup = 0
+        self.last_value = 0
+
         self.total_moves = 0
         self.total_games = 0
         self.is_winning = False
@@ -80,75 +125,50 @@ class Player:
         else:
             options = self.game.get_options()
 
-        if options is None or options.bit_count() == 0:
+        if not options:
             options = self.game.get_options()
         return self.choose_random_move(options)
 
     def choose_random_move(self, options):
-        options_count = options.bit_count()
-        move = self.rng.randint(1, options_count)
-        i = 0
-        for j in range(9):
-            bit = (options >> j) & 1
-            if bit == 1:
-                i += 1
-            if i == move:
-                return j
+        squares = BOARD_SQUARES[options]
+        move = self.rng.randint(1, len(squares))
+        return squares[move - 1]
 
     def choose_optimal_move(self, options):
-        i = 0
+        # a move only adds the player's digit for that square to the state index
+        player_state, opponent_state = self.get_current_states()
+        values = self.states.values
+        slots = self.states.slots
+        base_index = PLAYER_INDEX[player_state] + OPPONENT_INDEX[opponent_state]
+
         best_move_arr = []
         best_move_value = -1
-        for j in range(9):
-            bit = (options >> j) & 1
-            if bit == 1:
-                i += 1
-                option_value = self.get_move_value(j)
-                if option_value > best_move_value:
-                    best_move_arr = []
-                    best_move_value = option_value
-                    best_move_arr.append(j)
-                elif option_value == best_move_value:
-                    best_move_arr.append(j)
-
-        return random.choice(best_move_arr)
+        for j in BOARD_SQUARES[options]:
+            option_value = values[slots[base_index + PLAYER_INDEX[1 << j]]]
+            if option_value != option_value:
+                option_value = self.consider_state(
+                    player_state | (1 << j), opponent_state
+                )
+            if option_value > best_move_value:
+                best_move_arr = []
+                best_move_value = option_value
+                best_move_arr.append(j)
+            elif option_value == best_move_value:
+                best_move_arr.append(j)
+
+        return self.rng.choice(best_move_arr)
 
     def get_row_options(self, prev_move):
-        if prev_move < 3:
-            return self.game.get_options(0b000000111)
-        elif prev_move < 6:
-            return self.game.get_options(0b000111000)
-        else:
-            return self.game.get_options(0b111000000)
+        return self.game.get_options(ROW_MASKS[prev_move])
 
     def get_column_options(self, prev_move):
-        if prev_move % 3 == 0:
-            return self.game.get_options(0b001001001)
-        elif prev_move % 3 == 1:
-            return self.game.get_options(0b010010010)
-        else:
-            return self.game.get_options(0b100100100)
+        return self.game.get_options(COLUMN_MASKS[prev_move])
 
     def get_diagonal_options(self, prev_move):
-        if prev_move == 0 or prev_move == 8:
-            return self.game.get_options(0b100010001)
-        if prev_move == 2 or prev_move == 6:
-            return self.game.get_options(0b001010100)
-        if prev_move == 4:
-            return self.game.get_options(0b101010101)
-        else:
-            return self.game.get_options(0b111111111)
+        return self.game.get_options(DIAGONAL_MASKS[prev_move])
 
     def get_mirror_options(self, prev_move):
-        if prev_move == 4:
-            return self.game.get_options(0b111111111)
-        else:
-            i = prev_move
-            for j in range(8, -1, -1):
-                if i == 0:
-                    return self.game.get_options(0b000000000 | (1 << j))
-                else:
-                    i -= 1
+        return self.game.get_options(MIRROR_MASKS[prev_move])
 
     def get_move_value(self, move):
         player_state, opponent_state = self.get_current_states()
@@ -169,9 +189,13 @@ class Player:
         return player_state, opponent_state
 
     def consider_state(self, player_state, opponent_state):
-        state = player_state << 9 | opponent_state
-        if state in self.states:
-            return self.states[state]
+        value = self.states.values[
+            self.states.slots[
+                PLAYER_INDEX[player_state] + OPPONENT_INDEX[opponent_state]
+            ]
+        ]
+        if value == value:
+            return value
         elif self.game.check_is_winning(player_state):
             return 1
         else:
@@ -194,16 +218,19 @@ class Player:
 
     def log_value(self):
         # get state
-        combined_state = self.get_current_combined_state()
         player_state, opponent_state = self.get_current_states()
         current_value = self.consider_state(player_state, opponent_state)
 
         # log if player has won
         self.is_winning = current_value == 1
 
-        # log current state
-        if combined_state not in self.states:
-            self.states[combined_state] = current_value
+        # log current state, which keeps its value if it was already known
+        self.states.set_slot(
+            self.states.slots[
+                PLAYER_INDEX[player_state] + OPPONENT_INDEX[opponent_state]
+            ],
+            current_value,
+        )
 
         self.update_prev_state(current_value)
 
@@ -212,22 +239,63 @@ class Player:
 
     def update_prev_state(self, current_value):
         # Log prev state and get value
-        if self.prev_state not in self.states:
+        prev_slot = self.states.slot(self.prev_state)
+        prev_value = self.states.values[prev_slot]
+        if prev_value != prev_value:
             prev_player_state, prev_opponent_state = (
                 self.get_player_states_from_combined_state(self.prev_state)
             )
             prev_value = self.consider_state(prev_player_state, prev_opponent_state)
-            self.states[self.prev_state] = prev_value
-        prev_value = self.states[self.prev_state]
+
+        if self.visited is not None:
+            self.states.set_slot(prev_slot, prev_value)
+            self.visited.append(prev_slot)
+            self.last_value = current_value
+            if self.td_lambda:
+                self.log_change(self.update_trace(current_value - prev_value))
+            else:
+                self.log_change(self.update_n_step(current_value, self.n_step))
+            return
 
         # update previous state
         new_value = prev_value + self.learning_rate * (current_value - prev_value)
-        self.states[self.prev_state] = new_value
+        self.states.set_slot(prev_slot, new_value)
 
         self.average_change = calculate_running_average(
             self.average_change, abs(new_value - prev_value), self.total_moves
         )
 
+    # moves every state visited this game by the newest td error. the trace of a
+    # state visited k moves ago is lambda^k, since a game never visits the same
+    # state twice, so only the visited slots need to be kept
+    def update_trace(self, error):
+        values = self.states.values
+        step = self.learning_rate * error
+        change = 0
+        for i in range(len(self.visited) - 1, -1, -1):
+            values[self.visited[i]] += step
+            change += abs(step)
+            step *= self.td_lambda
+        return change
+
+    # moves each state that is at least n moves behind towards the value of the
+    # state reached, which is its n step return
+    def update_n_step(self, target, n):
+        values = self.states.values
+        change = 0
+        while len(self.visited) - self.next_backup >= n:
+            slot = self.visited[self.next_backup]
+            step = self.learning_rate * (target - values[slot])
+            values[slot] += step
+            change += abs(step)
+            self.next_backup += 1
+        return change
+
+    def log_change(self, change):
+        self.average_change = calculate_running_average(
+            self.average_change, change, self.total_moves
+        )
+
     def reset_player(self):
         self.total_games += 1
         self.win_rate = calculate_running_average(
@@ -239,6 +307,14 @@ class Player:
         self.is_winning = False
         self.prev_state = 0
 
+        # the game is over, so states still waiting for their n step return get
+        # the final value instead
+        if self.visited is not None:
+            if not self.td_lambda:
+                self.log_change(self.update_n_step(self.last_value, 1))
+            del self.visited[:]
+            self.next_backup = 0
+
     def print_top_states(self, top_n=10):
         sorted_states = sorted(self.states.items(), key=lambda x: x[1], reverse=True)
         print(
@@ -256,95 +332,445 @@ class Player:
         print()
 
 
-def main(args):
-    game = TicTacToeGame()
+class GridPlayer(Player):
+    # the same player for a GridGame of any size. states are kept in a dict keyed by
+    # (player_moves << cells) | opponent_moves, since a big board has far too many
+    # positions for a flat table, and moves are found by walking the set bits
+    def __init__(
+        self,
+        game,
+        player_type,
+        seed=None,
+        learning_rate=0.1,
+        exploring_rate=0.1,
+        states=None,
+    ):
+        super().__init__(
+            game,
+            player_type,
+            seed,
+            learning_rate,
+            exploring_rate,
+            False,
+            states if states is not None else {},
+        )
 
-    player_arr = []
-    opponent_arr = []
+    def choose_random_move(self, options):
+        squares = self.game.get_squares(options)
+        move = self.rng.randint(1, len(squares))
+        return squares[move - 1]
 
-    for player_type in PlayerType:
-        if player_type == PlayerType.PLAYER:
-            continue
+    def choose_optimal_move(self, options):
+        player_state, opponent_state = self.get_current_states()
+        best_move_arr = []
+        best_move_value = -1
+        cells = self.game.cells
+        for j in self.game.get_squares(options):
+            # like Player, an unseen move is worth 0.5 even if it would win, since
+            # consider_state checks the board before the move is played
+            next_state = player_state | (1 << j)
+            combined_state = (next_state << cells) | opponent_state
+            option_value = self.states.get(combined_state, 0.5)
+            if option_value > best_move_value:
+                best_move_arr = []
+                best_move_value = option_value
+                best_move_arr.append(j)
+            elif option_value == best_move_value:
+                best_move_arr.append(j)
+
+        return self.rng.choice(best_move_arr)
 
-        # build player array
-        player_arr.append(
-            Player(game, PlayerType.PLAYER, args.seed, args.learning_rate, 0)
-        )
-        player_arr.append(
-            Player(
-                game,
-                PlayerType.PLAYER,
-                args.seed,
-                args.learning_rate,
-                args.exploring_rate,
-            )
-        )
+    def get_row_options(self, prev_move):
+        return self.game.get_options(self.game.row_masks[prev_move])
+
+    def get_column_options(self, prev_move):
+        return self.game.get_options(self.game.column_masks[prev_move])
 
-        # build opponent array
-        opponent_arr.append(Player(game, player_type, args.seed, args.learning_rate, 0))
-        opponent_arr.append(
-            Player(
-                game, player_type, args.seed, args.learning_rate, args.exploring_rate
+    def get_diagonal_options(self, prev_move):
+        return self.game.get_options(self.game.diagonal_masks[prev_move])
+
+    def get_mirror_options(self, prev_move):
+        return self.game.get_options(self.game.mirror_masks[prev_move])
+
+    def consider_state(self, player_state, opponent_state):
+        state = (player_state << self.game.cells) | opponent_state
+        if state in self.states:
+            return self.states[state]
+        # the same check as Player.consider_state, which looks at the game's x board
+        elif self.game.check_is_winning(player_state):
+            return 1
+        else:
+            return 0.5
+
+    def get_current_combined_state(self):
+        player_state, opponent_state = self.get_current_states()
+        return (player_state << self.game.cells) | opponent_state
+
+    def get_player_states_from_combined_state(self, combined_state):
+        return combined_state >> self.game.cells, combined_state & self.game.full_board
+
+    def log_value(self):
+        # get state
+        combined_state = self.get_current_combined_state()
+        player_state, opponent_state = self.get_current_states()
+        current_value = self.consider_state(player_state, opponent_state)
+
+        # log if player has won
+        self.is_winning = current_value == 1
+
+        # log current state
+        if combined_state not in self.states:
+            self.states[combined_state] = current_value
+
+        self.update_prev_state(current_value)
+
+    def update_prev_state(self, current_value):
+        # Log prev state and get value
+        if self.prev_state not in self.states:
+            prev_player_state, prev_opponent_state = (
+                self.get_player_states_from_combined_state(self.prev_state)
+            )
+            self.states[self.prev_state] = self.consider_state(
+                prev_player_state, prev_opponent_state
             )
+        prev_value = self.states[self.prev_state]
+
+        # update previous state
+        new_value = prev_value + self.learning_rate * (current_value - prev_value)
+        self.states[self.prev_state] = new_value
+
+        self.average_change = calculate_running_average(
+            self.average_change, abs(new_value - prev_value), self.total_moves
         )
 
-    for i in range(len(player_arr)):
-        player = player_arr[i]
-        opponent = opponent_arr[i]
-        convergence_threshold = 0.001
 
+class MCTSPlayer(Player):
+    # plays x using monte carlo tree search instead of learned state values. it
+    # still explores with its exploring rate like Player, but there is nothing to
+    # converge, so matchups play every game. states is the search's transposition
+    # table
+    learns = False
+
+    def __init__(
+        self,
+        game,
+        seed=None,
+        exploring_rate=0.1,
+        iterations=1000,
+        time_limit=None,
+    ):
+        super().__init__(game, PlayerType.PLAYER, seed, 0, exploring_rate, False, {})
+        from util.mcts import MCTSSearch
+
+        self.search = MCTSSearch(self.rng, iterations, time_limit, nodes=self.states)
+
+    def choose_optimal_move(self, options):
+        return self.search.choose_move(self.game.x_moves, self.game.o_moves)
+
+    def log_value(self):
+        self.is_winning = self.game.check_is_winning(True)
+
+    def log_no_win(self):
+        return
+
+    def print_top_states(self, top_n=10):
+        search_time = self.search.total_search_time
+        print(
+            f"\nMCTS (Explore Rate: {self.exploring_rate}): {self.search.total_iterations} iterations in {search_time:.2f}s ({self.search.total_iterations / max(search_time, 1e-9):.0f} per second), {len(self.states)} positions in the table"
+        )
         print()
-        print()
+
+
+def main(args):
+    set_plot_mode(args.plot, args.plot_dir)
+
+    matchups = [
+        (player_type, exploring_rate)
+        for player_type in PlayerType
+        if player_type != PlayerType.PLAYER
+        for exploring_rate in [0, args.exploring_rate]
+    ]
+
+    play = play_batched_matchup if args.batched else play_matchup
+
+    results = []
+    if args.workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # every matchup has its own board and players, so they can run anywhere.
+        # their output is printed in the serial order as each one comes back
+        with ProcessPoolExecutor(args.workers) as executor:
+            futures = [
+                executor.submit(play_captured_matchup, play, args, player_type, rate)
+                for player_type, rate in matchups
+            ]
+            for future in futures:
+                result, output = future.result()
+                print(output, end="")
+                plot_matchup(result)
+                results.append(result)
+    else:
+        for player_type, exploring_rate in matchups:
+            result = play(args, player_type, exploring_rate)
+            plot_matchup(result)
+            results.append(result)
+
+    # title, width and value format of each results column
+    columns = [
+        ("Explore Rate", 12, ".1f"),
+        ("Opponent", 12, ""),
+        ("Win Rate", 10, ".4f"),
+        ("Explored States", 16, ""),
+    ]
+    if args.exact:
+        columns += [
+            ("Exact Win", 10, ".4f"),
+            ("Exact Draw", 10, ".4f"),
+            ("Exact Loss", 10, ".4f"),
+        ]
+
+    header = " | ".join(f"{title:<{width}}" for title, width, _ in columns)
+    print("RESULTS")
+    print("-" * len(header))
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        values = [
+            result["exploring_rate"],
+            result["opponent"],
+            result["win_rate"],
+            result["explored_states"],
+        ]
+        if args.exact:
+            values += result["exact"]
         print(
-            f"STARTING GAME VS {opponent.player_type.name} EXPLORING RATE: {player.exploring_rate}"
+            " | ".join(
+                f"{value:<{width}{spec}}"
+                for value, (_, width, spec) in zip(values, columns)
+            )
         )
 
-        while player.total_games <= args.num_rounds:
-            player_move = player.play_move()
-            game_over = player_move == -1
-            if not game_over:
-                opponent_move = opponent.play_move(player_move)
-                game_over = opponent_move == -1
-
-            if game_over:
-                game.clear_board()
-                player.reset_player()
-                opponent.reset_player()
-
-                if (
-                    player.average_change < convergence_threshold
-                    and player.total_games > 100
-                ):
-                    print(
-                        f"Converged after {player.total_games} games (avg_change={player.average_change:.6f})"
-                    )
-                    break
-
-        player.print_top_states()
-        plot_results(
-            [
-                {
-                    "record": player.win_record,
-                    "label": f"player exploration={player.exploring_rate}",
-                },
-            ],
-            f"Record Vs. {opponent.player_type.name}",
-            "Game",
-            "Win Rate",
+    close_plots()
+
+
+# trains a player against one type of opponent on its own board, until the player
+# converges or runs out of games
+def play_matchup(args, player_type, exploring_rate):
+    if args.mcts:
+        game = TicTacToeGame()
+        player = MCTSPlayer(
+            game,
+            args.seed,
+            exploring_rate,
+            args.mcts_iterations or None,
+            args.mcts_time,
+        )
+    elif args.size == 3 and args.k == 3:
+        game = TicTacToeGame()
+        player = Player(
+            game,
+            PlayerType.PLAYER,
+            args.seed,
+            args.learning_rate,
+            exploring_rate,
+            args.symmetric,
+            load_matchup_states(args, player_type, exploring_rate),
+            args.td_lambda,
+            args.n_step,
+        )
+    else:
+        game = GridGame(args.size, args.k)
+        player = GridPlayer(
+            game, PlayerType.PLAYER, args.seed, args.learning_rate, exploring_rate
         )
 
-    print("RESULTS")
-    print("-" * 60)
-    print(
-        f"{'Explore Rate':<12} | {'Opponent':<12} | {'Win Rate':<10} | {'Explored States':<16}"
+    # both sides key their states as (own moves, other moves), so a self play
+    # opponent can write into the player's table
+    shared_states = (
+        player.states if args.shared_table and player_type == PlayerType.SELF else None
     )
-    print("-" * 60)
-    for i in range(len(player_arr)):
-        disp_player = player_arr[i]
-        disp_opponent = opponent_arr[i]
-        print(
-            f"{disp_player.exploring_rate:<12.1f} | {disp_opponent.player_type.name:<12} | {disp_player.win_rate:<10.4f} | {len(disp_player.states) + 1:<10}"
+    if isinstance(game, GridGame):
+        opponent = GridPlayer(
+            game,
+            player_type,
+            args.seed,
+            args.learning_rate,
+            exploring_rate,
+            shared_states,
+        )
+    else:
+        opponent = Player(
+            game,
+            player_type,
+            args.seed,
+            args.learning_rate,
+            exploring_rate,
+            args.symmetric,
+            shared_states,
+            args.td_lambda,
+            args.n_step,
         )
+    convergence_threshold = 0.001
+
+    print()
+    print()
+    print(
+        f"STARTING GAME VS {opponent.player_type.name} EXPLORING RATE: {player.exploring_rate}"
+    )
+
+    while player.total_games <= args.num_rounds:
+        player_move = player.play_move()
+        game_over = player_move == -1
+        if not game_over:
+            opponent_move = opponent.play_move(player_move)
+            game_over = opponent_move == -1
+
+        if game_over:
+            game.clear_board()
+            player.reset_player()
+            opponent.reset_player()
+
+            if (
+                player.learns
+                and player.average_change < convergence_threshold
+                and player.total_games > 100
+            ):
+                print(
+                    f"Converged after {player.total_games} games (avg_change={player.average_change:.6f})"
+                )
+                break
+
+    player.print_top_states()
+    save_matchup_states(args, player_type, exploring_rate, player.states)
+
+    return {
+        "exploring_rate": player.exploring_rate,
+        "opponent": opponent.player_type.name,
+        "win_rate": player.win_rate,
+        "explored_states": count_explored_states(args, player_type, player.states),
+        "win_record": player.win_record,
+        "exact": evaluate_matchup(
+            args, player_type, exploring_rate, player.states, opponent.states
+        ),
+    }
+
+
+# plays the same matchup with thousands of games at once using numpy. the win
+# record is taken after every round of the batch instead of every game
+def play_batched_matchup(args, player_type, exploring_rate):
+    from util.batch_tic_tac_toe import BatchTicTacToe
+
+    batch = BatchTicTacToe(
+        player_type.name,
+        args.batch_size,
+        args.seed,
+        args.learning_rate,
+        exploring_rate,
+        args.symmetric,
+        args.shared_table,
+        load_matchup_states(args, player_type, exploring_rate),
+    )
+
+    print()
+    print()
+    print(f"STARTING GAME VS {player_type.name} EXPLORING RATE: {exploring_rate}")
+    batch.play(args.num_rounds)
+    print(
+        f"Played {batch.total_games} games (wins={batch.wins}, draws={batch.draws}, losses={batch.losses})"
+    )
+    print()
+    save_matchup_states(args, player_type, exploring_rate, batch.states)
+
+    return {
+        "exploring_rate": exploring_rate,
+        "opponent": player_type.name,
+        "win_rate": batch.win_rate,
+        "explored_states": count_explored_states(args, player_type, batch.states),
+        "win_record": batch.win_record,
+        "exact": evaluate_matchup(
+            args,
+            player_type,
+            exploring_rate,
+            batch.states,
+            batch.opponent.states if batch.opponent is not None else None,
+        ),
+    }
+
+
+# the explored states of the player. a shared table also holds the positions the
+# self play opponent moved into, which aren't counted
+def count_explored_states(args, player_type, states):
+    if args.shared_table and player_type == PlayerType.SELF:
+        return states.count_player_states() + 1
+    return len(states) + 1
+
+
+# exact win, draw and loss chances of the trained player playing only greedy moves
+# against the opponent it trained with
+def evaluate_matchup(args, player_type, exploring_rate, states, opponent_states):
+    if not args.exact:
+        return None
+    from util.policy_evaluator import PolicyEvaluator
+
+    evaluator = PolicyEvaluator(
+        states, player_type.name, 0, opponent_states, exploring_rate
+    )
+    return evaluator.evaluate()
+
+
+def matchup_table_path(directory, player_type, exploring_rate):
+    return os.path.join(
+        directory, f"{player_type.name.lower()}_{exploring_rate}.values"
+    )
+
+
+# warm starts a matchup from the table saved by an earlier run, if there is one
+def load_matchup_states(args, player_type, exploring_rate):
+    if args.load_dir is None:
+        return None
+    path = matchup_table_path(args.load_dir, player_type, exploring_rate)
+    if not os.path.exists(path):
+        return None
+    states, _ = load_value_table(path, writable=True)
+    return states
+
+
+def save_matchup_states(args, player_type, exploring_rate, states):
+    if args.save_dir is None:
+        return
+    os.makedirs(args.save_dir, exist_ok=True)
+    save_value_table(
+        states,
+        matchup_table_path(args.save_dir, player_type, exploring_rate),
+        args.learning_rate,
+        exploring_rate,
+        player_type.name,
+    )
+
+
+# runs a matchup in a worker process and hands back what it printed
+def play_captured_matchup(play, args, player_type, exploring_rate):
+    import contextlib
+    import io
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = play(args, player_type, exploring_rate)
+    return result, output.getvalue()
+
+
+def plot_matchup(result):
+    plot_results(
+        [
+            {
+                "record": result["win_record"],
+                "label": f"player exploration={result['exploring_rate']}",
+            },
+        ],
+        f"Record Vs. {result['opponent']}",
+        "Game",
+        "Win Rate",
+    )
 
 
 def player_type_parser(value):
@@ -360,6 +786,127 @@ if __name__ == "__main__":
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--learning_rate", type=float, default=0.1)
     parser.add_argument("--exploring_rate", type=float, default=0.1)
+    parser.add_argument(
+        "--td_lambda",
+        type=float,
+        default=0,
+        help="Back up every state of the game with td(lambda) instead of only the last one",
+    )
+    parser.add_argument(
+        "--n_step",
+        type=int,
+        default=1,
+        help="Back up each state towards the value of the state n moves later",
+    )
+    parser.add_argument(
+        "--size", type=int, default=3, help="Width and height of the board"
+    )
+    parser.add_argument(
+        "--k", type=int, default=3, help="Number in a row needed to win"
+    )
+    parser.add_argument(
+        "--mcts",
+        action="store_true",
+        help="Play x with monte carlo tree search instead of learning state values",
+    )
+    parser.add_argument(
+        "--mcts_iterations",
+        type=int,
+        default=1000,
+        help="Most search iterations per move with --mcts, 0 for no limit",
+    )
+    parser.add_argument(
+        "--mcts_time",
+        type=float,
+        default=None,
+        help="Most seconds of search per move with --mcts",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes to run the matchups on",
+    )
+    parser.add_argument(
+        "--save_dir",
+        type=str,
+        default=None,
+        help="Directory to save each player's value table to after training",
+    )
+    parser.add_argument(
+        "--load_dir",
+        type=str,
+        default=None,
+        help="Directory of value tables to warm start the players from",
+    )
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Also work out the exact win, draw and loss chances of each greedy player",
+    )
+    parser.add_argument(
+        "--batched",
+        action="store_true",
+        help="Play each matchup as a batch of games at once with numpy",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=1024,
+        help="Number of games played at once with --batched",
+    )
+    parser.add_argument(
+        "--symmetric",
+        action="store_true",
+        help="Share values between rotations and reflections of the board",
+    )
+    parser.add_argument(
+        "--shared_table",
+        action="store_true",
+        help="Have the SELF opponent learn into the same table as its player. Explored States still only counts the player's own positions",
+    )
+    parser.add_argument(
+        "--plot",
+        type=str,
+        choices=PLOT_MODES,
+        default="show",
+        help="Show the plots, save them to --plot_dir in the background, or skip them",
+    )
+    parser.add_argument("--plot_dir", type=str, default="plots")
 
     args = parser.parse_args()
+    if (args.size != 3 or args.k != 3) and (
+        args.symmetric
+        or args.batched
+        or args.exact
+        or args.save_dir is not None
+        or args.load_dir is not None
+    ):
+        parser.error(
+            "--symmetric, --batched, --exact, --save_dir and --load_dir only work on the 3 x 3 board"
+        )
+    if args.mcts and (
+        args.size != 3
+        or args.k != 3
+        or args.batched
+        or args.exact
+        or args.shared_table
+        or args.save_dir is not None
+        or args.load_dir is not None
+    ):
+        parser.error(
+            "--mcts can't be used with --size, --k, --batched, --exact, --shared_table, --save_dir or --load_dir"
+        )
+    if not 0 <= args.td_lambda <= 1 or args.n_step < 1:
+        parser.error("--td_lambda must be between 0 and 1 and --n_step at least 1")
+    if args.td_lambda and args.n_step > 1:
+        parser.error("--td_lambda and --n_step can't be used together")
+    if (args.td_lambda or args.n_step > 1) and (
+        args.size != 3 or args.k != 3 or args.batched or args.mcts
+    ):
+        parser.error(
+            "--td_lambda and --n_step only work with the normal player on the 3 x 3 board"
+        )
+    if args.mcts and args.mcts_iterations == 0 and args.mcts_time is None:
+        parser.error("--mcts needs --mcts_iterations or --mcts_time to stop searching")
     main(args)
@@ -5,11 +5,19 @@ import argparse
 import random
 from util.bandit_builder import BanditBuilder
 from util.data_calculator import DataCalculator
-from util.functions import calculate_running_average, cs_log, plot_results
+from util.functions import (
+    PLOT_MODES,
+    calculate_running_average,
+    close_plots,
+    cs_log,
+    plot_results,
+    set_plot_mode,
+)
+from util.ucb_index import UCBIndex
 
 
 class UCBBanditPuller:
-    def __init__(self, num_actions, confidence_rate=10):
+    def __init__(self, num_actions, confidence_rate=10, record_stride=1, sink=None):
         self.actions = [
             {"observed_reward": 0, "times_pulled": 0} for _ in range(num_actions)
         ]
@@ -17,6 +25,9 @@ class UCBBanditPuller:
         self.confidence_rate = confidence_rate
         self.average_reward = 0
 
+        # only every record_stride rounds is kept in the record and sent to the sink
+        self.record_stride = record_stride
+        self.sink = sink
         self.record = []
         self.pull_record = [0 for _ in range(num_actions)]
 
@@ -51,29 +62,122 @@ class UCBBanditPuller:
         self.average_reward = calculate_running_average(
             self.average_reward, reward, self.total_pulls
         )
-        self.record.append(self.average_reward)
 
         # add to pulls taken
         self.total_pulls += 1
         self.pull_record[rank] += 1
+        self.log_record()
+
+    def log_record(self):
+        if self.total_pulls % self.record_stride != 0:
+            return
+        self.record.append(self.average_reward)
+        if self.sink is not None:
+            self.sink(self.total_pulls, self.average_reward, self.pull_record[0])
+
+
+class IndexedUCBBanditPuller(UCBBanditPuller):
+    # makes the same choices as UCBBanditPuller but keeps the arms grouped by pull
+    # count in heaps, so a round no longer has to scan every arm
+    def __init__(self, num_actions, confidence_rate=10, record_stride=1, sink=None):
+        super().__init__(num_actions, confidence_rate, record_stride, sink)
+        self.index = UCBIndex(num_actions, confidence_rate)
+
+    def choose_action(self):
+        return self.index.choose_action(self.actions, self.total_pulls)
+
+    def log_action(self, action, reward, rank):
+        super().log_action(action, reward, rank)
+        self.index.update(action, self.actions)
 
 
 def main(args):
+    set_plot_mode(args.plot, args.plot_dir)
 
     # tracking data across all trials
-    data_calculator = DataCalculator(args.num_arms, args.num_rounds)
+    if args.accumulate:
+        from util.trial_accumulator import TrialAccumulator
+
+        data_calculator = TrialAccumulator(
+            args.num_arms, args.num_rounds, args.num_trials, args.memmap_path
+        )
+    else:
+        data_calculator = DataCalculator(args.num_arms, args.num_rounds)
 
     # want to control the seed but also have a different seed for each trial
     rng = random.Random(args.seed)
     init_seed = rng.randint(1, 100)
 
+    if args.batched:
+        # numpy is only needed for the batched engine
+        from util.batched_ucb import run_batched_trials
+
+        run_batched_trials(
+            data_calculator,
+            args.num_trials,
+            args.num_arms,
+            args.num_rounds,
+            init_seed,
+            args.confidence_rate,
+        )
+    elif args.workers > 1:
+        from util.parallel_trials import run_parallel_trials
+
+        run_parallel_trials(run_trial, args, init_seed, [data_calculator])
+    else:
+        run_trials(data_calculator, args, init_seed)
+        if args.accumulate:
+            data_calculator.reduce()
+
+    print_results(args, data_calculator)
+    close_plots()
+
+
+def build_bandit(args, trial_seed):
+    if args.array_bandit:
+        from util.array_bandit import ArrayBandit
+
+        return ArrayBandit(args.num_arms, trial_seed, True)
+    return BanditBuilder(args.num_arms, trial_seed, True)
+
+
+def build_puller(args, sink=None):
+    puller_class = IndexedUCBBanditPuller if args.indexed else UCBBanditPuller
+    return puller_class(args.num_arms, args.confidence_rate, args.record_stride, sink)
+
+
+# run one full trial without printing, used by the worker processes
+def run_trial(args, trial_seed):
+    bandit = build_bandit(args, trial_seed)
+    puller = build_puller(args)
+
+    values = []
+    ranks = []
+    for _ in range(args.num_rounds):
+        picked_arm = puller.choose_action()
+        value, rank = bandit.pull_arm(picked_arm)
+        puller.log_action(picked_arm, value, rank)
+        values.append(puller.average_reward)
+        ranks.append(rank)
+
+    optimal_value = bandit.get_expected_value(bandit.get_optimal_action())
+    return [(optimal_value, bandit.sorted_values, values, ranks)]
+
+
+def run_trials(data_calculator, args, init_seed):
+    sink = None
+    if args.record_path is not None:
+        from util.metric_sink import MetricSink
+
+        sink = MetricSink(args.record_path, args.record_format)
+
     for i in range(args.num_trials):
         print()
         print()
         print(f"TRIAL {i+1}")
 
-        bandit = BanditBuilder(args.num_arms, init_seed + i, True)
-        puller = UCBBanditPuller(args.num_arms, args.confidence_rate)
+        bandit = build_bandit(args, init_seed + i)
+        puller = build_puller(args, sink.channel(i) if sink else None)
 
         optimal_value = bandit.get_expected_value(bandit.get_optimal_action())
         optimal_record = [optimal_value for _ in range(1, args.num_rounds + 1)]
@@ -81,13 +185,19 @@ def main(args):
         data_calculator.start_trial(i, optimal_value)
         data_calculator.update_average_pull_values(bandit.sorted_values, i)
 
+        values = []
+        ranks = []
         for j in range(args.num_rounds):
             picked_arm = puller.choose_action()
             value, rank = bandit.pull_arm(picked_arm)
             puller.log_action(picked_arm, value, rank)
 
-            data_calculator.update_value(puller.record[j], j)
-            data_calculator.update_pull_record(puller.pull_record, j)
+            if args.accumulate:
+                values.append(puller.average_reward)
+                ranks.append(rank)
+            else:
+                data_calculator.update_value(puller.average_reward, j)
+                data_calculator.update_pull_record(puller.pull_record, j)
 
             if (j + 1) % 100 == 0:
                 print(f"optimal arm pulled {puller.pull_record[0]} times")
@@ -95,12 +205,24 @@ def main(args):
 
         print(f"Optimal Expected Value: {optimal_value}")
 
+        if args.accumulate:
+            data_calculator.record_trial(values, ranks)
+
+    if sink is not None:
+        sink.close()
+
+
+def print_results(args, data_calculator):
     print()
     print("FINAL RESULTS")
     print("-" * 50)
     print(f"Seed: {args.seed}")
     print(f"Confidence Rate: {args.confidence_rate}")
     print(f"Final Average Value: {data_calculator.total_optimal_value_record[-1]}")
+    if args.accumulate:
+        low, high = data_calculator.confidence_band()
+        print(f"Final Value Variance: {data_calculator.value_variance[-1]}")
+        print(f"Final Value 95% Band: [{low[-1]:.6f}, {high[-1]:.6f}]")
     print("-" * 50)
     print(f"{'Pulled Arm':<10} | {'Percentage Pulled':<17} | {'Average Value':<13}")
     for i in range(len(data_calculator.total_optimal_pull_record)):
@@ -149,6 +271,64 @@ if __name__ == "__main__":
     parser.add_argument("--num_trials", type=int, default=100, help="Number of trials")
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--confidence_rate", type=float, default=1)
+    parser.add_argument(
+        "--batched",
+        action="store_true",
+        help="Run all trials at once with the numpy engine",
+    )
+    parser.add_argument(
+        "--accumulate",
+        action="store_true",
+        help="Store every trial in a numpy array and reduce at the end",
+    )
+    parser.add_argument(
+        "--memmap_path",
+        type=str,
+        default=None,
+        help="File prefix for memory mapping the --accumulate arrays",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes to run the trials on",
+    )
+    parser.add_argument(
+        "--indexed",
+        action="store_true",
+        help="Choose arms using heaps grouped by pull count, for large arm counts",
+    )
+    parser.add_argument(
+        "--array_bandit",
+        action="store_true",
+        help="Store the bandit arms in compact arrays, for large arm counts",
+    )
+    parser.add_argument(
+        "--record_stride",
+        type=int,
+        default=1,
+        help="Only record the average reward every this many rounds",
+    )
+    parser.add_argument(
+        "--record_path",
+        type=str,
+        default=None,
+        help="File to stream the recorded rounds to while running, serial runs only",
+    )
+    parser.add_argument(
+        "--record_format", type=str, choices=["csv", "bin"], default="csv"
+    )
+    parser.add_argument(
+        "--plot",
+        type=str,
+        choices=PLOT_MODES,
+        default="show",
+        help="Show the plots, save them to --plot_dir in the background, or skip them",
+    )
+    parser.add_argument("--plot_dir", type=str, default="plots")
 
     args = parser.parse_args()
+    # the recorded rounds are only streamed from the serial trial loop
+    if args.record_path is not None and (args.batched or args.workers > 1):
+        parser.error("--record_path can't be used with --batched or --workers")
     main(args)
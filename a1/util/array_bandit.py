@@ -0,0 +1,98 @@
+from array import array
+import random
+
+import numpy as np
+
+# number of random draws generated at a time
+DRAW_BLOCK = 4096
+
+
+class ArrayBandit:
+    # compact version of BanditBuilder. the arms are slots in parallel arrays of
+    # values, probabilities and ranks instead of one dict per arm, and the random
+    # numbers used by the pulls are generated ahead of time in blocks.
+    #
+    # the arms and the draws come from the same random.Random stream in the same
+    # order as BanditBuilder, so a bandit built with the same seed has identical arms
+    # and gives identical rewards for the same sequence of pulls
+    def __init__(self, num_arms, seed=None, is_binary=True, block_size=DRAW_BLOCK):
+        self.rng = random.Random(seed)
+        self.num_arms = num_arms
+        self.is_binary = is_binary
+        self.block_size = block_size
+
+        self.values = array("q")
+        self.probs = array("d")
+        for _ in range(num_arms):
+            self.values.append(1 if is_binary else self.rng.randint(1, 10))
+            self.probs.append(self.rng.random())
+
+        sorted_indices = sorted(
+            range(num_arms), key=lambda i: self.get_expected_value(i), reverse=True
+        )
+
+        # sorting the arms by value so that we can plot them as options
+        # on the graph across all trials
+        self.ranks = array("q", bytes(8 * num_arms))
+        self.sorted_values = []
+        for rank, arm_index in enumerate(sorted_indices):
+            self.ranks[arm_index] = rank
+            self.sorted_values.append(self.get_expected_value(arm_index))
+
+        self.optimal_action = sorted_indices[0]
+        self.optimal_action_value = self.get_expected_value(self.optimal_action)
+
+        self.draws = array("d")
+        self.position = 0
+
+        # zero copy views of the arm slots for the bulk pulls
+        self.value_view = np.frombuffer(self.values, dtype=np.int64)
+        self.prob_view = np.frombuffer(self.probs, dtype=np.float64)
+        self.rank_view = np.frombuffer(self.ranks, dtype=np.int64)
+
+    def get_expected_value(self, arm):
+        return self.values[arm] * self.probs[arm]
+
+    def get_optimal_action(self):
+        return self.optimal_action
+
+    # make sure at least n draws are waiting, keeping the ones not used yet
+    def fill_draws(self, n):
+        remaining = len(self.draws) - self.position
+        if remaining >= n:
+            return
+        rng = self.rng
+        block = array("d", [rng.random() for _ in range(max(self.block_size, n))])
+        self.draws = self.draws[self.position :] + block
+        self.position = 0
+
+    # the next n random numbers as a numpy array, in the order pulls would use them
+    def next_draws(self, n):
+        self.fill_draws(n)
+        draws = np.frombuffer(self.draws, dtype=np.float64)[
+            self.position : self.position + n
+        ].copy()
+        self.position += n
+        return draws
+
+    def pull_arm(self, arm):
+        position = self.position
+        try:
+            draw = self.draws[position]
+        except IndexError:
+            self.fill_draws(1)
+            position = self.position
+            draw = self.draws[position]
+        self.position = position + 1
+        if draw < self.probs[arm]:
+            return self.values[arm], self.ranks[arm]
+        else:
+            return 0, self.ranks[arm]
+
+    # pull a whole vector of arms in order, gives the same rewards as calling
+    # pull_arm on each of them
+    def pull_many(self, arms):
+        arms = np.asarray(arms)
+        draws = self.next_draws(len(arms))
+        rewards = np.where(draws < self.prob_view[arms], self.value_view[arms], 0)
+        return rewards, self.rank_view[arms]
@@ -0,0 +1,244 @@
+import numpy as np
+
+from util.tic_tac_toe_game import (
+    BOARD_SQUARES,
+    COLUMN_MASKS,
+    DIAGONAL_MASKS,
+    MIRROR_MASKS,
+    ROW_MASKS,
+    WINNING_BOARDS,
+)
+from util.value_table import (
+    NUM_STATES,
+    OPPONENT_INDEX,
+    PLAYER_INDEX,
+    ValueTable,
+    index_state,
+)
+
+FULL_BOARD = 0b111111111
+SQUARES = np.arange(9)
+SQUARE_BITS = 1 << SQUARES
+SQUARE_INDEX = 3**SQUARES
+
+PLAYER_INDEX_ARRAY = np.array(PLAYER_INDEX)
+OPPONENT_INDEX_ARRAY = np.array(OPPONENT_INDEX)
+WINNING_ARRAY = np.array(WINNING_BOARDS)
+
+# which squares are set in each board, and the set squares of each board packed to
+# the front of a row so that a random one is a single lookup
+BOARD_SQUARE_ARRAY = ((np.arange(512)[:, None] >> SQUARES) & 1).astype(bool)
+BOARD_SQUARE_COUNTS = BOARD_SQUARE_ARRAY.sum(axis=1)
+PACKED_SQUARES = np.array(
+    [
+        list(BOARD_SQUARES[board]) + [0] * (9 - len(BOARD_SQUARES[board]))
+        for board in range(512)
+    ]
+)
+
+# value an unseen state reached by x starts with, 1 if x has already won and 0.5
+# if not
+UNSEEN_VALUES = np.where(
+    WINNING_ARRAY[np.array([index_state(i) >> 9 for i in range(NUM_STATES)])],
+    1.0,
+    0.5,
+)
+
+# the squares each fixed opponent may pick from, given the learner's last move.
+# RANDOM may pick any free square
+OPPONENT_MASKS = {
+    "RANDOM": np.full(9, FULL_BOARD),
+    "RANDOM_ROW": np.array(ROW_MASKS),
+    "RANDOM_COL": np.array(COLUMN_MASKS),
+    "RANDOM_DIAG": np.array(DIAGONAL_MASKS),
+    "MIRROR": np.array(MIRROR_MASKS),
+}
+
+
+class BatchLearner:
+    # the learning side of a batch of games. keeps the same afterstate values as
+    # Player, in a ValueTable that numpy reads and writes in place.
+    #
+    # unseen states are valued like Player.consider_state, which checks the game's
+    # x board: a move being chosen is worth 0.5 even if it would win, and the state
+    # a move reaches is worth 1 only when the learner playing x has won
+    def __init__(self, num_games, learning_rate, exploring_rate, states, plays_x=True):
+        self.learning_rate = learning_rate
+        self.plays_x = plays_x
+        self.exploring_rate = exploring_rate
+        self.states = states
+        self.values = np.frombuffer(states.values)
+        self.slots = np.array(states.slots)
+
+        # every game starts from the empty board, which is state index 0
+        if np.isnan(self.values[self.slots[0]]):
+            self.values[self.slots[0]] = 0.5
+        self.prev_slots = np.full(num_games, self.slots[0])
+
+    # value of each afterstate, with unseen states given their unseen values
+    def state_values(self, indexes, unseen_values):
+        values = self.values[self.slots[indexes]]
+        return np.where(np.isnan(values), unseen_values, values)
+
+    def choose_moves(self, rng, own, other, options):
+        legal = BOARD_SQUARE_ARRAY[options]
+
+        # value every square at once and keep a random best one, like
+        # choose_optimal_move does
+        base_index = PLAYER_INDEX_ARRAY[own] + OPPONENT_INDEX_ARRAY[other]
+        indexes = np.where(legal, base_index[:, None] + SQUARE_INDEX, 0)
+        option_values = self.state_values(indexes, 0.5)
+        option_values[~legal] = -np.inf
+        best = option_values == option_values.max(axis=1, keepdims=True)
+        moves = choose_squares(rng, best @ SQUARE_BITS)
+
+        exploring = rng.random(len(own)) <= self.exploring_rate
+        moves[exploring] = choose_squares(rng, options[exploring])
+        return moves
+
+    # moves every state seen this ply towards the average of its targets, so games
+    # that pass through the same state don't push it further than one game would
+    def back_up(self, games, targets):
+        prev_slots = self.prev_slots[games]
+        changes = targets - self.values[prev_slots]
+        sums = np.bincount(prev_slots, weights=changes, minlength=len(self.values))
+        counts = np.bincount(prev_slots, minlength=len(self.values))
+        seen = counts > 0
+        self.values[seen] += self.learning_rate * sums[seen] / counts[seen]
+
+    # plays one move in each of the given games and logs the new state
+    def play_moves(self, rng, games, own, other):
+        options = (own[games] | other[games]) ^ FULL_BOARD
+        moves = self.choose_moves(rng, own[games], other[games], options)
+        own[games] |= SQUARE_BITS[moves]
+
+        indexes = PLAYER_INDEX_ARRAY[own[games]] + OPPONENT_INDEX_ARRAY[other[games]]
+        current_values = self.state_values(
+            indexes, UNSEEN_VALUES[indexes] if self.plays_x else 0.5
+        )
+        current_slots = self.slots[indexes]
+        self.values[current_slots] = current_values
+
+        self.back_up(games, current_values)
+        self.prev_slots[games] = current_slots
+        return moves
+
+    def reset_games(self, games):
+        self.prev_slots[games] = self.slots[0]
+
+
+# picks one of the squares set in each board uniformly at random
+def choose_squares(rng, boards):
+    picks = (rng.random(len(boards)) * BOARD_SQUARE_COUNTS[boards]).astype(np.int64)
+    return PACKED_SQUARES[boards, picks]
+
+
+class BatchTicTacToe:
+    # plays many games at once against one opponent type, with every board held as
+    # numpy arrays of 9-bit x and o moves. the learner plays x like Player does,
+    # and each ply is a handful of array operations across the whole batch. a
+    # finished game is reset straight away so the batch is always full.
+    #
+    # fixed opponents pick a random free square inside the mask for the learner's
+    # last move, falling back to any free square. a SELF opponent is a second
+    # learner playing o. unseen states are valued like Player.
+    #
+    # a state that several games reach in the same ply gets one update towards the
+    # average of their targets, where Player would back it up once per game, one
+    # after another. so even with the same moves the values and results differ
+    # from the scalar loop, not just the order the random numbers come out in
+    def __init__(
+        self,
+        opponent_type,
+        num_games=1024,
+        seed=None,
+        learning_rate=0.1,
+        exploring_rate=0.1,
+        symmetric=False,
+        shared_table=False,
+        states=None,
+    ):
+        self.rng = np.random.default_rng(seed)
+        self.opponent_type = opponent_type
+        self.num_games = num_games
+        self.exploring_rate = exploring_rate
+
+        self.x_moves = np.zeros(num_games, dtype=np.int64)
+        self.o_moves = np.zeros(num_games, dtype=np.int64)
+        self.games = np.arange(num_games)
+
+        self.states = states if states is not None else ValueTable(symmetric)
+        self.player = BatchLearner(
+            num_games, learning_rate, exploring_rate, self.states
+        )
+        self.opponent = None
+        if opponent_type == "SELF":
+            opponent_states = (
+                self.states if shared_table else ValueTable(self.states.symmetric)
+            )
+            self.opponent = BatchLearner(
+                num_games, learning_rate, exploring_rate, opponent_states, False
+            )
+        elif opponent_type not in OPPONENT_MASKS:
+            raise ValueError(f"Invalid opponent type: {opponent_type}")
+
+        self.total_games = 0
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.win_record = []
+
+    @property
+    def win_rate(self):
+        return self.wins / max(self.total_games, 1)
+
+    def play(self, num_games):
+        # the same bound as the scalar loop in play_matchup
+        while self.total_games <= num_games:
+            self.play_round()
+        self.states.sync_order()
+
+    # the learner moves in every game, then the opponent moves in every game that
+    # is still going
+    def play_round(self):
+        x_moves = self.x_moves
+        o_moves = self.o_moves
+
+        player_moves = self.player.play_moves(self.rng, self.games, x_moves, o_moves)
+        won = WINNING_ARRAY[x_moves]
+        drawn = ~won & ((x_moves | o_moves) == FULL_BOARD)
+        self.wins += int(won.sum())
+        self.draws += int(drawn.sum())
+        if self.opponent is not None:
+            self.opponent.back_up(self.games[won | drawn], 0.0)
+
+        playing = ~(won | drawn)
+        self.reset_games(self.games[~playing])
+
+        games = self.games[playing]
+        if self.opponent is not None:
+            self.opponent.play_moves(self.rng, games, o_moves, x_moves)
+        else:
+            options = (x_moves[games] | o_moves[games]) ^ FULL_BOARD
+            allowed = (
+                options & OPPONENT_MASKS[self.opponent_type][player_moves[playing]]
+            )
+            allowed = np.where(allowed == 0, options, allowed)
+            moves = choose_squares(self.rng, allowed)
+            o_moves[games] |= SQUARE_BITS[moves]
+
+        # the learner's last state led to a loss, the same as log_no_win
+        lost = games[WINNING_ARRAY[o_moves[games]]]
+        self.losses += len(lost)
+        self.player.back_up(lost, 0.0)
+        self.reset_games(lost)
+
+        self.win_record.append(self.win_rate)
+
+    def reset_games(self, games):
+        self.total_games += len(games)
+        self.x_moves[games] = 0
+        self.o_moves[games] = 0
+        self.player.reset_games(games)
+        if self.opponent is not None:
+            self.opponent.reset_games(games)
@@ -0,0 +1,143 @@
+import numpy as np
+
+from util.array_bandit import ArrayBandit
+from util.functions import cs_log
+from util.trial_accumulator import TrialAccumulator
+
+# upper bound on the number of pull counts buffered before they are folded into
+# the data calculator, keeps memory flat when running thousands of trials
+BLOCK_ELEMENTS = 1 << 24
+
+
+class BatchedUCBBanditPuller:
+    # same algorithm as UCBBanditPuller, but every row of the arrays is an
+    # independent trial so a whole round is a handful of array operations
+    def __init__(self, num_trials, num_actions, confidence_rate=10):
+        self.num_trials = num_trials
+        self.num_actions = num_actions
+        self.observed_reward = np.zeros((num_trials, num_actions))
+        self.times_pulled = np.zeros((num_trials, num_actions), dtype=np.int64)
+        self.total_pulls = 0
+        self.confidence_rate = confidence_rate
+        self.average_reward = np.zeros(num_trials)
+
+        self.pull_record = np.zeros((num_trials, num_actions), dtype=np.int64)
+        self.trials = np.arange(num_trials)
+
+    def choose_action(self):
+        potential = (
+            np.sqrt(cs_log(self.total_pulls) / np.maximum(self.times_pulled, 1))
+            * self.confidence_rate
+        )
+        potential_value = self.observed_reward + potential
+
+        # the scalar version keeps the last arm that ties the best value, so
+        # search the reversed rows to break ties the same way
+        best_action = self.num_actions - 1 - np.argmax(potential_value[:, ::-1], axis=1)
+        best_action[potential_value.max(axis=1) < 0] = 0
+        return best_action
+
+    def log_action(self, actions, rewards, ranks):
+        step = 1 / max(self.total_pulls, 1)
+
+        # calculate average reward for specific action
+        observed_reward = self.observed_reward[self.trials, actions]
+        self.observed_reward[self.trials, actions] = observed_reward + step * (
+            rewards - observed_reward
+        )
+        self.times_pulled[self.trials, actions] += 1
+
+        # calculate total average reward
+        self.average_reward = self.average_reward + step * (
+            rewards - self.average_reward
+        )
+
+        # add to pulls taken
+        self.total_pulls += 1
+        self.pull_record[self.trials, ranks] += 1
+
+
+def build_bandit_arrays(bandits):
+    probs = np.stack([b.prob_view for b in bandits])
+    values = np.stack([b.value_view for b in bandits])
+    ranks = np.stack([b.rank_view for b in bandits])
+    return probs, values, ranks
+
+
+# fold a block of trials into the running averages the same way DataCalculator
+# does, one trial at a time so the floating point results are identical
+def fold_block(record, block, start_turn, num_rounds):
+    turns = np.arange(start_turn, start_turn + block.shape[1])
+    for i in range(block.shape[0]):
+        if i == 0:
+            record[start_turn : start_turn + block.shape[1]] = block[0]
+            continue
+        prev = record[start_turn : start_turn + block.shape[1]]
+        record[start_turn : start_turn + block.shape[1]] = prev + (
+            1 / (num_rounds * i + turns + 1)
+        ) * (block[i] - prev)
+
+
+def run_batched_trials(
+    data_calculator, num_trials, num_arms, num_rounds, init_seed, confidence_rate
+):
+    bandits = [ArrayBandit(num_arms, init_seed + i, True) for i in range(num_trials)]
+    probs, values, ranks = build_bandit_arrays(bandits)
+    optimal_values = np.array(
+        [b.get_expected_value(b.get_optimal_action()) for b in bandits]
+    )
+    for i, bandit in enumerate(bandits):
+        data_calculator.update_average_pull_values(bandit.sorted_values, i)
+
+    puller = BatchedUCBBanditPuller(num_trials, num_arms, confidence_rate)
+    trials = puller.trials
+
+    value_record = np.zeros(num_rounds)
+    pull_record = np.zeros((num_arms, num_rounds))
+
+    block_rounds = max(1, min(num_rounds, BLOCK_ELEMENTS // (num_trials * num_arms)))
+    for start in range(0, num_rounds, block_rounds):
+        rounds = min(block_rounds, num_rounds - start)
+
+        # each bandit keeps its own generator, so draw this block's random numbers
+        # per trial in the same order pull_arm would have consumed them
+        draws = np.stack([bandit.next_draws(rounds) for bandit in bandits])
+        value_block = np.zeros((num_trials, rounds))
+        rank_block = np.zeros((num_trials, rounds), dtype=np.int64)
+        pull_block = None
+        if not isinstance(data_calculator, TrialAccumulator):
+            pull_block = np.zeros((num_trials, rounds, num_arms), dtype=np.int64)
+
+        for j in range(rounds):
+            picked_arm = puller.choose_action()
+            hit = draws[:, j] < probs[trials, picked_arm]
+            reward = np.where(hit, values[trials, picked_arm], 0)
+            rank_block[:, j] = ranks[trials, picked_arm]
+            puller.log_action(picked_arm, reward, rank_block[:, j])
+
+            value_block[:, j] = puller.average_reward
+            if pull_block is not None:
+                pull_block[:, j] = puller.pull_record
+
+        if pull_block is None:
+            data_calculator.record_rounds(
+                start, value_block, rank_block, optimal_values
+            )
+            continue
+
+        fold_block(
+            value_record, value_block / optimal_values[:, None], start, num_rounds
+        )
+        turns = np.arange(start + 1, start + rounds + 1)
+        for arm in range(num_arms):
+            fold_block(
+                pull_record[arm], pull_block[:, :, arm] / turns, start, num_rounds
+            )
+
+    if isinstance(data_calculator, TrialAccumulator):
+        data_calculator.reduce()
+        return data_calculator
+
+    data_calculator.total_optimal_value_record = value_record.tolist()
+    data_calculator.total_optimal_pull_record = pull_record.tolist()
+    return data_calculator
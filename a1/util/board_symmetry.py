@@ -0,0 +1,46 @@
+# the 8 rotations and reflections of the board. each one is a permutation of the
+# squares, and BOARD_SYMMETRIES[s][board] applies symmetry s to a whole 9-bit board
+# with a single lookup
+#
+#    0 | 1 | 2
+#    ---------
+#    3 | 4 | 5
+#    ---------
+#    6 | 7 | 8
+
+
+def permute_square(square, symmetry):
+    row, col = divmod(square, 3)
+    row, col = [
+        (row, col),  # identity
+        (col, 2 - row),  # rotate 90
+        (2 - row, 2 - col),  # rotate 180
+        (2 - col, row),  # rotate 270
+        (row, 2 - col),  # mirror left to right
+        (2 - row, col),  # mirror top to bottom
+        (col, row),  # main diagonal
+        (2 - col, 2 - row),  # anti diagonal
+    ][symmetry]
+    return row * 3 + col
+
+
+SQUARE_PERMUTATIONS = [[permute_square(j, s) for j in range(9)] for s in range(8)]
+
+BOARD_SYMMETRIES = [
+    [
+        sum(1 << permutation[j] for j in range(9) if (board >> j) & 1)
+        for board in range(512)
+    ]
+    for permutation in SQUARE_PERMUTATIONS
+]
+
+
+# smallest combined state out of all 8 symmetries of the two boards, so every
+# position that looks the same after turning or flipping the board shares a key
+def canonical_state(combined_state):
+    player_state = combined_state >> 9
+    opponent_state = combined_state & 0b111111111
+    return min(
+        (symmetry[player_state] << 9) | symmetry[opponent_state]
+        for symmetry in BOARD_SYMMETRIES
+    )
@@ -1,11 +1,12 @@
+import atexit
 import math
 
-try:
-    import matplotlib.pyplot as plt
-
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
+# how plot_results draws figures. "show" opens a window, "save" writes png files
+# from a background process and "none" skips plotting. matplotlib is only imported
+# once a figure is actually drawn so scripts start quickly
+PLOT_MODES = ["show", "save", "none"]
+plot_mode = "show"
+plot_worker = None
 
 
 def calculate_running_average(prev_average, new_reward, total_attempts):
@@ -26,18 +27,45 @@ def debug_print(str, debug=False):
     return
 
 
+def set_plot_mode(mode, plot_dir="plots"):
+    global plot_mode, plot_worker
+    if mode not in PLOT_MODES:
+        raise ValueError(f"Invalid plot mode: {mode}")
+
+    if mode == "save" and plot_worker is None:
+        from util.plot_worker import PlotWorker
+
+        plot_worker = PlotWorker(plot_dir)
+        atexit.register(close_plots)
+    plot_mode = mode
+
+
+# waits for the background process to finish writing the figures
+def close_plots():
+    global plot_worker
+    if plot_worker is not None:
+        plot_worker.close()
+        plot_worker = None
+
+
 # this will never run on moon
 def plot_results(data, title, x_label, y_label):
-    if MATPLOTLIB_AVAILABLE:
-        for point in data:
-            label = point.get("label", "")
-            record = point.get("record")
-            plt.plot(record, label=label)
-        plt.title(title if title else "")
-        plt.xlabel(x_label if x_label else "")
-        plt.ylabel(y_label if y_label else "")
-        plt.legend()
-        plt.show()
+    if plot_mode == "none":
+        return
+    if plot_mode == "save":
+        if plot_worker is not None:
+            plot_worker.submit(data, title, x_label, y_label)
+        return
+
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return
+
+    from util.plot_worker import draw_figure
+
+    draw_figure(plt, data, title, x_label, y_label)
+    plt.show()
 
 
 def as_9bit(x):
@@ -0,0 +1,186 @@
+# tic tac toe on an N x N board where k in a row wins. the board is represented the
+# same way as TicTacToeGame, one bit per square numbered row by row, except the
+# boards are N * N bit python ints
+#
+#    For example with N = 4 the squares are numbered:
+#
+#     0 |  1 |  2 |  3
+#    ------------------
+#     4 |  5 |  6 |  7
+#    ------------------
+#     8 |  9 | 10 | 11
+#    ------------------
+#    12 | 13 | 14 | 15
+#
+# every mask the game needs is generated once per (N, k) and shared between games
+
+# masks for each (N, k) already built
+GRID_MASKS = {}
+
+
+def build_grid_masks(size, k):
+    cells = size * size
+
+    def mask(squares):
+        return sum(1 << (row * size + col) for row, col in squares)
+
+    # the shift between neighbouring squares in each direction along with the
+    # squares a line in that direction can start from without running off the board
+    directions = [
+        (1, mask((r, c) for r in range(size) for c in range(size - k + 1))),
+        (size, mask((r, c) for r in range(size - k + 1) for c in range(size))),
+        (
+            size + 1,
+            mask((r, c) for r in range(size - k + 1) for c in range(size - k + 1)),
+        ),
+        (
+            size - 1,
+            mask((r, c) for r in range(size - k + 1) for c in range(k - 1, size)),
+        ),
+    ]
+
+    lines = []
+    for shift, starts in directions:
+        for start in range(cells):
+            if (starts >> start) & 1:
+                lines.append(sum(1 << (start + i * shift) for i in range(k)))
+
+    full_board = (1 << cells) - 1
+    main_diagonal = mask((i, i) for i in range(size))
+    anti_diagonal = mask((i, size - 1 - i) for i in range(size))
+
+    row_masks = []
+    column_masks = []
+    diagonal_masks = []
+    mirror_masks = []
+    for move in range(cells):
+        row, col = divmod(move, size)
+        row_masks.append(mask((row, c) for c in range(size)))
+        column_masks.append(mask((r, col) for r in range(size)))
+
+        # like the 3 x 3 game, squares off both diagonals allow the whole board
+        diagonal_mask = 0
+        if row == col:
+            diagonal_mask |= main_diagonal
+        if row + col == size - 1:
+            diagonal_mask |= anti_diagonal
+        diagonal_masks.append(diagonal_mask or full_board)
+
+        # the centre of an odd board is its own mirror, so it allows the whole board
+        opposite = cells - 1 - move
+        mirror_masks.append(full_board if opposite == move else 1 << opposite)
+
+    return {
+        "directions": directions,
+        "lines": lines,
+        "lines_through": [
+            [line for line in lines if (line >> move) & 1] for move in range(cells)
+        ],
+        "row_masks": row_masks,
+        "column_masks": column_masks,
+        "diagonal_masks": diagonal_masks,
+        "mirror_masks": mirror_masks,
+    }
+
+
+class GridGame:
+    def __init__(self, size=3, k=3):
+        if not 1 <= k <= size:
+            raise ValueError(f"Can't get {k} in a row on a {size} x {size} board")
+        self.size = size
+        self.k = k
+        self.cells = size * size
+        self.full_board = (1 << self.cells) - 1
+
+        if (size, k) not in GRID_MASKS:
+            GRID_MASKS[(size, k)] = build_grid_masks(size, k)
+        masks = GRID_MASKS[(size, k)]
+        self.directions = masks["directions"]
+        self.lines = masks["lines"]
+        self.lines_through = masks["lines_through"]
+        self.row_masks = masks["row_masks"]
+        self.column_masks = masks["column_masks"]
+        self.diagonal_masks = masks["diagonal_masks"]
+        self.mirror_masks = masks["mirror_masks"]
+
+        self.clear_board()
+
+    # a square starts a line when it and the next k - 1 squares in one direction
+    # are all set, which is k - 1 shifts and ands of the whole board per direction
+    def check_is_winning(self, check_x=True, state=None):
+        if state is None:
+            moves = self.x_moves if check_x else self.o_moves
+        else:
+            moves = state
+
+        for shift, starts in self.directions:
+            run = moves & starts
+            for i in range(1, self.k):
+                if not run:
+                    break
+                run &= moves >> (i * shift)
+            if run:
+                return True
+        return False
+
+    # only the lines through the last move can have been completed by it
+    def is_winning_move(self, moves, move):
+        for line in self.lines_through[move]:
+            if (line & moves) == line:
+                return True
+        return False
+
+    def check_is_draw(self, state=None):
+        moves = self.get_full_board() if state is None else state
+        return moves & self.full_board == self.full_board
+
+    def get_full_board(self):
+        return self.x_moves ^ self.o_moves
+
+    def get_options(self, mask=None):
+        if mask is None:
+            mask = self.full_board
+        return (self.get_full_board() & mask) ^ mask
+
+    # the squares set in a board from lowest to highest
+    def get_squares(self, board):
+        squares = []
+        while board:
+            low_bit = board & -board
+            squares.append(low_bit.bit_length() - 1)
+            board ^= low_bit
+        return squares
+
+    def play_move(self, move, is_x=True):
+        if is_x:
+            self.x_moves |= 1 << move
+        else:
+            self.o_moves |= 1 << move
+
+    def clear_board(self):
+        self.x_moves = 0
+        self.o_moves = 0
+
+    def print_readable_state(self, input_state=None):
+        combined_state = (
+            input_state
+            if input_state is not None
+            else (self.x_moves << self.cells) | self.o_moves
+        )
+        x_state = combined_state >> self.cells
+        o_state = combined_state & self.full_board
+        for row in range(self.size):
+            print(" ", end="")
+            for col in range(self.size):
+                pos = row * self.size + col
+                if (x_state >> pos) & 1:
+                    print("X", end="")
+                elif (o_state >> pos) & 1:
+                    print("O", end="")
+                else:
+                    print(" ", end="")
+
+                if col != self.size - 1:
+                    print(" | ", end="")
+                else:
+                    print()
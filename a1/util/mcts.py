@@ -0,0 +1,160 @@
+import math
+import time
+
+from util.board_symmetry import canonical_state
+from util.tic_tac_toe_game import BOARD_SQUARES, WINNING_BOARDS
+
+FULL_BOARD = 0b111111111
+
+
+class MCTSSearch:
+    # monte carlo tree search over tic tac toe positions. nodes are kept in a
+    # transposition table keyed by the canonical (x_moves << 9) | o_moves, so every
+    # rotation or reflection of a position, and every move order reaching it, shares
+    # the same visit count and total reward. the reward of a node is from the side
+    # that moved into it: 1 for a win, 0.5 for a draw and 0 for a loss.
+    #
+    # the table is never cleared, so after a move the part of the tree under it is
+    # already there for the next search, and later games start from everything the
+    # earlier ones found
+    def __init__(
+        self, rng, iterations=1000, time_limit=None, confidence_rate=1.4, nodes=None
+    ):
+        self.rng = rng
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.confidence_rate = confidence_rate
+
+        # canonical state -> [visits, total reward]
+        self.nodes = nodes if nodes is not None else {}
+
+        # state -> list of (move, canonical child state), so the symmetries of a
+        # position are only worked out once
+        self.children = {}
+
+        self.total_iterations = 0
+        self.total_search_time = 0
+
+    def get_children(self, state):
+        if state not in self.children:
+            x_moves = state >> 9
+            o_moves = state & FULL_BOARD
+            x_to_move = x_moves.bit_count() == o_moves.bit_count()
+            children = []
+            for move in BOARD_SQUARES[(x_moves | o_moves) ^ FULL_BOARD]:
+                if x_to_move:
+                    child = ((x_moves | (1 << move)) << 9) | o_moves
+                else:
+                    child = (x_moves << 9) | o_moves | (1 << move)
+                children.append((move, canonical_state(child)))
+            self.children[state] = children
+        return self.children[state]
+
+    # best move for the side to move in state, searching until the iteration or
+    # time budget runs out, whichever comes first
+    def choose_move(self, x_moves, o_moves):
+        state = (x_moves << 9) | o_moves
+        root = canonical_state(state)
+        self.nodes.setdefault(root, [0, 0.0])
+
+        start = time.perf_counter()
+        iterations = 0
+        while self.iterations is None or iterations < self.iterations:
+            if (
+                self.time_limit is not None
+                and time.perf_counter() - start >= self.time_limit
+            ):
+                break
+            self.run_iteration(state, root)
+            iterations += 1
+
+        self.total_iterations += iterations
+        self.total_search_time += time.perf_counter() - start
+
+        # the most visited move is the most reliable one
+        best_move = None
+        best_visits = -1
+        for move, child in self.get_children(state):
+            visits = self.nodes[child][0] if child in self.nodes else 0
+            if visits > best_visits:
+                best_move = move
+                best_visits = visits
+        return best_move
+
+    def run_iteration(self, state, root):
+        path = [root]
+        x_moves = state >> 9
+        o_moves = state & FULL_BOARD
+
+        while True:
+            winner = self.get_winner(x_moves, o_moves)
+            if winner is not None:
+                break
+
+            # expand the first child never visited, otherwise follow the upper
+            # confidence bound of each child from the side to move
+            children = self.get_children((x_moves << 9) | o_moves)
+            chosen = None
+            for move, child in children:
+                if self.nodes.setdefault(child, [0, 0.0])[0] == 0:
+                    chosen = move, child
+                    break
+            expanded = chosen is not None
+
+            if not expanded:
+                log_visits = math.log(max(self.nodes[path[-1]][0], 1))
+                best_value = -1
+                for move, child in children:
+                    visits, reward = self.nodes[child]
+                    value = reward / visits + self.confidence_rate * math.sqrt(
+                        log_visits / visits
+                    )
+                    if value > best_value:
+                        best_value = value
+                        chosen = move, child
+
+            move, child = chosen
+            if x_moves.bit_count() == o_moves.bit_count():
+                x_moves |= 1 << move
+            else:
+                o_moves |= 1 << move
+            path.append(child)
+
+            if expanded:
+                winner = self.rollout(x_moves, o_moves)
+                break
+
+        # back up the result, each node scored for the side that moved into it
+        for node in path:
+            stats = self.nodes[node]
+            stats[0] += 1
+            if winner == 0:
+                stats[1] += 0.5
+            else:
+                x_moved = (node >> 9).bit_count() > (node & FULL_BOARD).bit_count()
+                if x_moved == (winner == 1):
+                    stats[1] += 1
+
+    # 1 if x has won, -1 if o has won, 0 for a draw and None if the game is still
+    # going
+    def get_winner(self, x_moves, o_moves):
+        if WINNING_BOARDS[x_moves]:
+            return 1
+        if WINNING_BOARDS[o_moves]:
+            return -1
+        if x_moves | o_moves == FULL_BOARD:
+            return 0
+        return None
+
+    # plays random moves until the game is over
+    def rollout(self, x_moves, o_moves):
+        winner = self.get_winner(x_moves, o_moves)
+        while winner is None:
+            squares = BOARD_SQUARES[(x_moves | o_moves) ^ FULL_BOARD]
+            move = squares[self.rng.randrange(len(squares))]
+            if x_moves.bit_count() == o_moves.bit_count():
+                x_moves |= 1 << move
+            else:
+                o_moves |= 1 << move
+            winner = self.get_winner(x_moves, o_moves)
+        return winner
@@ -0,0 +1,48 @@
+import struct
+
+# binary checkpoints are fixed size little endian records of
+# trial (int32), series (int32), round (int64), average reward (float64) and
+# optimal arm pulls (int64)
+RECORD_FORMAT = struct.Struct("<iiqdq")
+CSV_HEADER = "trial,series,round,average_reward,optimal_pulls\n"
+
+
+class MetricSink:
+    # writes puller checkpoints to a file as they happen so that long runs can be
+    # watched while they execute without keeping every round in memory
+    def __init__(self, path, file_format="csv"):
+        self.file_format = file_format
+        if file_format == "csv":
+            self.file = open(path, "w", buffering=1)
+            self.file.write(CSV_HEADER)
+        elif file_format == "bin":
+            self.file = open(path, "wb")
+        else:
+            raise ValueError(f"Invalid record format: {file_format}")
+
+    def write(self, trial, series, round, average_reward, optimal_pulls):
+        if self.file_format == "csv":
+            self.file.write(
+                f"{trial},{series},{round},{average_reward!r},{optimal_pulls}\n"
+            )
+        else:
+            self.file.write(
+                RECORD_FORMAT.pack(trial, series, round, average_reward, optimal_pulls)
+            )
+            self.file.flush()
+
+    # a callable for a single puller, so pullers don't need to know which trial or
+    # series they are writing
+    def channel(self, trial, series=0):
+        def write_checkpoint(round, average_reward, optimal_pulls):
+            self.write(trial, series, round, average_reward, optimal_pulls)
+
+        return write_checkpoint
+
+    def close(self):
+        self.file.close()
+
+
+def read_binary_metrics(path):
+    with open(path, "rb") as file:
+        return list(RECORD_FORMAT.iter_unpack(file.read()))
@@ -0,0 +1,82 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+
+import numpy as np
+
+from util.batched_ucb import fold_block
+from util.trial_accumulator import TrialAccumulator
+
+# how many chunks of trials each worker gets, more chunks balance the load better
+CHUNKS_PER_WORKER = 4
+
+
+class PartialRecord:
+    # the results of a set of trials, keyed by trial index so that partial records
+    # coming back from different workers can be merged in any order
+    def __init__(self, trials=None):
+        self.trials = trials if trials is not None else {}
+
+    # every trial produces one (optimal_value, sorted_values, record, ranks) tuple
+    # per calculator it is tracked by
+    def add_trial(self, i, results):
+        self.trials[i] = results
+
+    def merge(self, other):
+        return PartialRecord({**self.trials, **other.trials})
+
+    def apply(self, calculators):
+        order = sorted(self.trials)
+        for c, calculator in enumerate(calculators):
+            for i in order:
+                optimal_value, sorted_values, _, _ = self.trials[i][c]
+                calculator.update_average_pull_values(sorted_values, i)
+
+            if isinstance(calculator, TrialAccumulator):
+                for i in order:
+                    optimal_value, _, record, ranks = self.trials[i][c]
+                    calculator.start_trial(i, optimal_value)
+                    calculator.record_trial(record, ranks)
+                calculator.reduce()
+            else:
+                self.fold(calculator, c, order)
+
+    # replay the trials through the same running averages DataCalculator uses, in
+    # trial order, so the result is identical to a serial run
+    def fold(self, data_calculator, c, order):
+        num_rounds = data_calculator.num_rounds
+        optimal_values = np.array([self.trials[i][c][0] for i in order])
+        values = np.array([self.trials[i][c][2] for i in order])
+        ranks = np.array([self.trials[i][c][3] for i in order])
+        turns = np.arange(1, num_rounds + 1)
+
+        value_record = np.zeros(num_rounds)
+        fold_block(value_record, values / optimal_values[:, None], 0, num_rounds)
+        data_calculator.total_optimal_value_record = value_record.tolist()
+
+        for arm in range(data_calculator.num_arms):
+            pull_record = np.zeros(num_rounds)
+            pulls = np.cumsum(ranks == arm, axis=1)
+            fold_block(pull_record, pulls / turns, 0, num_rounds)
+            data_calculator.total_optimal_pull_record[arm] = pull_record.tolist()
+
+
+def run_trial_chunk(run_trial, args, init_seed, trials):
+    partial = PartialRecord()
+    for i in trials:
+        partial.add_trial(i, run_trial(args, init_seed + i))
+    return partial
+
+
+def run_parallel_trials(run_trial, args, init_seed, calculators):
+    num_chunks = min(args.num_trials, args.workers * CHUNKS_PER_WORKER)
+    chunks = [range(c, args.num_trials, num_chunks) for c in range(num_chunks)]
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(run_trial_chunk, run_trial, args, init_seed, chunk)
+            for chunk in chunks
+        ]
+        partials = [future.result() for future in futures]
+
+    reduce(PartialRecord.merge, partials, PartialRecord()).apply(calculators)
+    return calculators
@@ -0,0 +1,71 @@
+import multiprocessing
+import os
+import re
+
+
+def figure_path(plot_dir, index, title):
+    name = re.sub(r"[^A-Za-z0-9]+", "_", title).strip("_").lower() or "figure"
+    return os.path.join(plot_dir, f"{index:03d}_{name}.png")
+
+
+def draw_figure(plt, data, title, x_label, y_label):
+    for point in data:
+        label = point.get("label", "")
+        record = point.get("record")
+        plt.plot(record, label=label)
+    plt.title(title if title else "")
+    plt.xlabel(x_label if x_label else "")
+    plt.ylabel(y_label if y_label else "")
+    plt.legend()
+
+
+# runs in its own process and saves every figure it is sent until it gets None
+def render_figures(queue, plot_dir):
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        plt = None
+
+    index = 0
+    while True:
+        job = queue.get()
+        if job is None:
+            return
+        if plt is None:
+            continue
+
+        data, title, x_label, y_label = job
+        plt.figure()
+        draw_figure(plt, data, title, x_label, y_label)
+        plt.savefig(figure_path(plot_dir, index, title))
+        plt.close()
+        index += 1
+
+
+class PlotWorker:
+    # hands figures to a background process so the experiment never waits on
+    # matplotlib. the queue pickles the records on its own thread, so submit
+    # returns straight away
+    def __init__(self, plot_dir):
+        os.makedirs(plot_dir, exist_ok=True)
+        self.queue = multiprocessing.Queue()
+        self.process = multiprocessing.Process(
+            target=render_figures, args=(self.queue, plot_dir), daemon=True
+        )
+        self.process.start()
+
+    def submit(self, data, title, x_label, y_label):
+        self.queue.put((data, title, x_label, y_label))
+
+    # waits for every submitted figure to be written
+    def close(self):
+        if self.process is None:
+            return
+        self.queue.put(None)
+        self.queue.close()
+        self.queue.join_thread()
+        self.process.join()
+        self.process = None
@@ -0,0 +1,145 @@
+from util.tic_tac_toe_game import (
+    BOARD_SQUARES,
+    COLUMN_MASKS,
+    DIAGONAL_MASKS,
+    MIRROR_MASKS,
+    ROW_MASKS,
+    WINNING_BOARDS,
+)
+from util.value_table import OPPONENT_INDEX, PLAYER_INDEX
+
+FULL_BOARD = 0b111111111
+
+# the squares each fixed opponent picks from, given the player's last move
+OPPONENT_MASKS = {
+    "RANDOM_ROW": ROW_MASKS,
+    "RANDOM_COL": COLUMN_MASKS,
+    "RANDOM_DIAG": DIAGONAL_MASKS,
+    "MIRROR": MIRROR_MASKS,
+}
+
+
+class PolicyEvaluator:
+    # exact chances of a frozen player winning, drawing and losing against one type
+    # of opponent. the player plays x and moves to its best valued state like
+    # choose_optimal_move, splitting evenly between ties, or picks any free square
+    # with its exploring rate. every position is solved once and remembered, so the
+    # whole game tree takes milliseconds and there is no sampling noise.
+    #
+    # unseen states are worth 0.5, even ones that would win. that is what
+    # choose_optimal_move gives them, since consider_state checks the board before
+    # the move is played. a SELF opponent needs its own table and plays the same
+    # way from the o side
+    def __init__(
+        self,
+        states,
+        opponent_type,
+        exploring_rate=0,
+        opponent_states=None,
+        opponent_exploring_rate=0,
+    ):
+        if opponent_type == "SELF" and opponent_states is None:
+            raise ValueError("A SELF opponent needs its own value table")
+        if opponent_type not in OPPONENT_MASKS and opponent_type not in [
+            "RANDOM",
+            "SELF",
+        ]:
+            raise ValueError(f"Invalid opponent type: {opponent_type}")
+
+        self.states = states
+        self.opponent_type = opponent_type
+        self.exploring_rate = exploring_rate
+        self.opponent_states = opponent_states
+        self.opponent_exploring_rate = opponent_exploring_rate
+
+        self.player_results = {}
+        self.opponent_results = {}
+
+    # (win, draw, loss) chances from the empty board
+    def evaluate(self):
+        return self.player_turn(0, 0)
+
+    # chance of each move from own's side, as a list of (move, chance)
+    def move_chances(self, states, exploring_rate, own, other):
+        squares = BOARD_SQUARES[(own | other) ^ FULL_BOARD]
+        base_index = PLAYER_INDEX[own] + OPPONENT_INDEX[other]
+
+        best_moves = []
+        best_value = -1
+        for j in squares:
+            value = states.values[states.slots[base_index + PLAYER_INDEX[1 << j]]]
+            if value != value:
+                value = 0.5
+            if value > best_value:
+                best_moves = [j]
+                best_value = value
+            elif value == best_value:
+                best_moves.append(j)
+
+        explore_chance = exploring_rate / len(squares)
+        greedy_chance = (1 - exploring_rate) / len(best_moves)
+        return [
+            (j, explore_chance + (greedy_chance if j in best_moves else 0))
+            for j in squares
+        ]
+
+    def player_turn(self, x_moves, o_moves):
+        key = (x_moves << 9) | o_moves
+        if key in self.player_results:
+            return self.player_results[key]
+
+        win, draw, loss = 0.0, 0.0, 0.0
+        for move, chance in self.move_chances(
+            self.states, self.exploring_rate, x_moves, o_moves
+        ):
+            if chance == 0:
+                continue
+            next_x_moves = x_moves | (1 << move)
+            if WINNING_BOARDS[next_x_moves]:
+                win += chance
+            elif next_x_moves | o_moves == FULL_BOARD:
+                draw += chance
+            else:
+                result = self.opponent_turn(next_x_moves, o_moves, move)
+                win += chance * result[0]
+                draw += chance * result[1]
+                loss += chance * result[2]
+
+        self.player_results[key] = (win, draw, loss)
+        return win, draw, loss
+
+    def opponent_turn(self, x_moves, o_moves, prev_move):
+        key = (((x_moves << 9) | o_moves) << 4) | prev_move
+        if key in self.opponent_results:
+            return self.opponent_results[key]
+
+        if self.opponent_type == "SELF":
+            chances = self.move_chances(
+                self.opponent_states, self.opponent_exploring_rate, o_moves, x_moves
+            )
+        else:
+            options = (x_moves | o_moves) ^ FULL_BOARD
+            if self.opponent_type in OPPONENT_MASKS:
+                options = (options & OPPONENT_MASKS[self.opponent_type][prev_move]) or (
+                    options
+                )
+            squares = BOARD_SQUARES[options]
+            chances = [(j, 1 / len(squares)) for j in squares]
+
+        win, draw, loss = 0.0, 0.0, 0.0
+        for move, chance in chances:
+            if chance == 0:
+                continue
+            next_o_moves = o_moves | (1 << move)
+            if WINNING_BOARDS[next_o_moves]:
+                loss += chance
+            elif x_moves | next_o_moves == FULL_BOARD:
+                draw += chance
+            else:
+                result = self.player_turn(x_moves, next_o_moves)
+                win += chance * result[0]
+                draw += chance * result[1]
+                loss += chance * result[2]
+
+        self.opponent_results[key] = (win, draw, loss)
+        return win, draw, loss
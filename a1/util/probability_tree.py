@@ -0,0 +1,70 @@
+# once the global scale drops below this the weights are folded back into the
+# tree, long before the scale or the weights could underflow or overflow
+MIN_SCALE = 1e-100
+
+
+class ProbabilityTree:
+    # probability vector stored as weights times a global scale, with a Fenwick tree
+    # over the weights. scaling every probability is O(1), changing one probability
+    # is O(log k) and sampling is a single O(log k) descent of the tree
+    def __init__(self, probs):
+        self.size = len(probs)
+        self.scale = 1.0
+        self.rebuild(list(probs))
+
+    def rebuild(self, weights):
+        self.weights = weights
+        self.tree = [0.0] + weights
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+        self.total_weight = sum(weights)
+
+        # largest power of two not bigger than the size, where the descent starts
+        self.top = 1
+        while self.top * 2 <= self.size:
+            self.top *= 2
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        return self.scale * self.weights[i]
+
+    def total(self):
+        return self.scale * self.total_weight
+
+    # a factor of 0 zeroes every weight, which is folded in here too so add never
+    # divides by a zero scale
+    def scale_all(self, factor):
+        self.scale *= factor
+        if self.scale <= MIN_SCALE:
+            weights = [w * self.scale for w in self.weights]
+            self.scale = 1.0
+            self.rebuild(weights)
+
+    def add(self, i, amount):
+        delta = amount / self.scale
+        self.weights[i] += delta
+        self.total_weight += delta
+        i += 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    # index of the first probability where the running total goes past choice, the
+    # same as walking the cumulative sum. falls back to the last index if the
+    # probabilities add up to less than choice
+    def sample(self, choice):
+        target = choice / self.scale
+        if target >= self.total_weight:
+            return self.size - 1
+        pos = 0
+        step = self.top
+        while step > 0:
+            if pos + step <= self.size and self.tree[pos + step] <= target:
+                pos += step
+                target -= self.tree[pos]
+            step //= 2
+        return min(pos, self.size - 1)
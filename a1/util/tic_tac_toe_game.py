@@ -28,6 +28,46 @@
 #   0b001000110    <-- Xs moves
 #
 
+# every row, column and diagonal that wins the game
+WINNING_MAPS = [
+    0b111000000,
+    0b100100100,
+    0b010010010,
+    0b001001001,
+    0b000111000,
+    0b000000111,
+    0b100010001,
+    0b001010100,
+]
+
+# whether each of the 512 boards contains a winning line
+WINNING_BOARDS = [
+    any((winning_map & board) == winning_map for winning_map in WINNING_MAPS)
+    for board in range(512)
+]
+
+# the squares set in each board from lowest to highest, so the nth set bit of a
+# board is BOARD_SQUARES[board][n] without walking the bits
+BOARD_SQUARES = [tuple(j for j in range(9) if (board >> j) & 1) for board in range(512)]
+
+# masks of the squares sharing a row, column or diagonal with each move, and the
+# square opposite each move through the centre. moves that aren't on a diagonal
+# and the centre itself allow the whole board
+ROW_MASKS = [0b000000111 << (3 * (move // 3)) for move in range(9)]
+COLUMN_MASKS = [0b001001001 << (move % 3) for move in range(9)]
+DIAGONAL_MASKS = [
+    0b100010001,
+    0b111111111,
+    0b001010100,
+    0b111111111,
+    0b101010101,
+    0b111111111,
+    0b001010100,
+    0b111111111,
+    0b100010001,
+]
+MIRROR_MASKS = [0b111111111 if move == 4 else 1 << (8 - move) for move in range(9)]
+
 
 class TicTacToeGame:
     def __init__(self):
@@ -39,20 +79,7 @@ class TicTacToeGame:
         else:
             moves = state
 
-        winning_maps = [
-            0b111000000,
-            0b100100100,
-            0b010010010,
-            0b001001001,
-            0b000111000,
-            0b000000111,
-            0b100010001,
-            0b001010100,
-        ]
-        for winning_map in winning_maps:
-            if (winning_map & moves) == winning_map:
-                return True
-        return False
+        return WINNING_BOARDS[moves]
 
     def check_is_draw(self, state=None):
         moves = self.get_full_board() if state is None else state
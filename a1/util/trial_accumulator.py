@@ -0,0 +1,99 @@
+import numpy as np
+
+# number of float32 cells reduced at a time, keeps the temporary arrays small
+# even when the trajectories live in a memmap that is larger than memory
+REDUCE_ELEMENTS = 1 << 22
+
+
+class TrialAccumulator:
+    # drop in replacement for DataCalculator that stores every trial's trajectory
+    # in a preallocated (trials x rounds) array and only reduces at the end
+    def __init__(self, num_arms, num_rounds, num_trials, path=None):
+        self.num_arms = num_arms
+        self.num_rounds = num_rounds
+        self.num_trials = num_trials
+
+        shape = (num_trials, num_rounds)
+        if path is None:
+            self.values = np.zeros(shape, dtype=np.float32)
+            self.ranks = np.zeros(shape, dtype=np.int32)
+        else:
+            self.values = np.memmap(
+                f"{path}_values.dat", dtype=np.float32, mode="w+", shape=shape
+            )
+            self.ranks = np.memmap(
+                f"{path}_ranks.dat", dtype=np.int32, mode="w+", shape=shape
+            )
+        self.sorted_values = np.zeros((num_trials, num_arms))
+
+        self.total_optimal_value_record = []
+        self.total_optimal_pull_record = [[] for _ in range(num_arms)]
+        self.average_pull_values = []
+        self.value_variance = []
+
+        self.trial = 0
+        self.optimal_value = 0
+
+    def start_trial(self, i, optimal_value):
+        self.trial = i
+        self.optimal_value = optimal_value
+
+    def update_average_pull_values(self, pull_values, trial):
+        self.sorted_values[trial] = pull_values
+
+    # record is the running average reward per round and ranks is the rank of the
+    # arm pulled each round
+    def record_trial(self, record, ranks):
+        self.values[self.trial] = np.asarray(record) / self.optimal_value
+        self.ranks[self.trial] = ranks
+
+    # write the same rounds for a block of trials at once (used by the batched engine)
+    def record_rounds(self, start_turn, values, ranks, optimal_values):
+        turns = slice(start_turn, start_turn + values.shape[1])
+        self.values[:, turns] = values / optimal_values[:, None]
+        self.ranks[:, turns] = ranks
+
+    def reduce(self):
+        rows = max(1, REDUCE_ELEMENTS // max(self.num_rounds, 1))
+        turns = np.arange(1, self.num_rounds + 1)
+
+        count = 0
+        mean = np.zeros(self.num_rounds)
+        m2 = np.zeros(self.num_rounds)
+        pull_sum = np.zeros((self.num_arms, self.num_rounds))
+        for start in range(0, self.num_trials, rows):
+            values = np.asarray(self.values[start : start + rows], dtype=np.float64)
+            ranks = np.asarray(self.ranks[start : start + rows])
+
+            # combine the block mean and squared deviations with the running ones
+            block_count = values.shape[0]
+            block_mean = values.mean(axis=0)
+            block_m2 = ((values - block_mean) ** 2).sum(axis=0)
+            total = count + block_count
+            diff = block_mean - mean
+            mean = mean + diff * block_count / total
+            m2 = m2 + block_m2 + diff**2 * count * block_count / total
+            count = total
+
+            for arm in range(self.num_arms):
+                pulls = np.cumsum(ranks == arm, axis=1, dtype=np.int32)
+                pull_sum[arm] += (pulls / turns).sum(axis=0)
+
+        self.total_optimal_value_record = mean.tolist()
+        self.value_variance = (m2 / max(count - 1, 1)).tolist()
+        self.total_optimal_pull_record = (pull_sum / max(count, 1)).tolist()
+        self.average_pull_values = self.sorted_values.mean(axis=0).tolist()
+
+    def percentiles(self, q):
+        return np.percentile(self.values, q, axis=0)
+
+    # normal approximation of the confidence band around the mean value record
+    def confidence_band(self, z=1.96):
+        mean = np.array(self.total_optimal_value_record)
+        error = z * np.sqrt(np.array(self.value_variance) / max(self.num_trials, 1))
+        return mean - error, mean + error
+
+    def flush(self):
+        if isinstance(self.values, np.memmap):
+            self.values.flush()
+            self.ranks.flush()
@@ -0,0 +1,106 @@
+import heapq
+import math
+
+from util.functions import cs_log
+
+
+class UCBIndex:
+    # picks the same arm as UCBBanditPuller.choose_action without scanning every arm.
+    #
+    # the confidence bonus only depends on the total pulls and an arm's own pull
+    # count, so every arm pulled the same number of times gets the same bonus and
+    # their order never changes unless one of them is pulled. the arms are grouped
+    # by pull count, and each group keeps a max-heap of the observed rewards in it
+    # with a bucket of arm indexes per reward. a round only looks at the top of each
+    # group and pulling an arm moves it to the next group in O(log arms). old entries
+    # are skipped lazily using a stamp per arm.
+    def __init__(self, num_actions, confidence_rate):
+        self.num_actions = num_actions
+        self.confidence_rate = confidence_rate
+
+        self.stamps = [0 for _ in range(num_actions)]
+        self.stale = 0
+        self.groups = {}
+        self.rebuild([{"observed_reward": 0, "times_pulled": 0}] * num_actions)
+
+    def add(self, i, action):
+        # the bonus uses max(times_pulled, 1), so unpulled arms share a group with
+        # arms that have been pulled once
+        times_pulled = max(action["times_pulled"], 1)
+        observed_reward = action["observed_reward"]
+
+        reward_heap, buckets = self.groups.setdefault(times_pulled, ([], {}))
+        if observed_reward not in buckets:
+            buckets[observed_reward] = []
+            heapq.heappush(reward_heap, -observed_reward)
+        heapq.heappush(buckets[observed_reward], (-i, self.stamps[i]))
+
+    def rebuild(self, actions):
+        self.groups = {}
+        for i in range(self.num_actions):
+            self.add(i, actions[i])
+        self.stale = 0
+
+    def choose_action(self, actions, total_pulls):
+        log_term = cs_log(total_pulls)
+        best_action = None
+        best_value = 0
+        for times_pulled in list(self.groups):
+            potential = math.sqrt(log_term / times_pulled) * self.confidence_rate
+            action, value = self.group_best(times_pulled, potential)
+            if action is None:
+                continue
+            if value > best_value or (
+                value == best_value and (best_action is None or action > best_action)
+            ):
+                best_value = value
+                best_action = action
+        return best_action if best_action is not None else 0
+
+    # highest arm index still in the bucket, or None once every arm has moved on
+    def bucket_top(self, buckets, observed_reward):
+        bucket = buckets.get(observed_reward)
+        while bucket and bucket[0][1] != self.stamps[-bucket[0][0]]:
+            heapq.heappop(bucket)
+            self.stale -= 1
+        if not bucket:
+            buckets.pop(observed_reward, None)
+            return None
+        return -bucket[0][0]
+
+    # the top reward in the group gives the best potential value, but rounding can
+    # make a slightly lower reward give the same value, so keep going while they
+    # match and take the highest index like the exhaustive scan does
+    def group_best(self, times_pulled, potential):
+        reward_heap, buckets = self.groups[times_pulled]
+        best_action = None
+        best_value = None
+        popped = []
+        while reward_heap:
+            observed_reward = -reward_heap[0]
+            i = self.bucket_top(buckets, observed_reward)
+            if i is None:
+                heapq.heappop(reward_heap)
+                continue
+            value = observed_reward + potential
+            if best_action is not None and value < best_value:
+                break
+            popped.append(heapq.heappop(reward_heap))
+            if best_action is None or i > best_action:
+                best_action = i
+                best_value = value
+
+        for entry in popped:
+            heapq.heappush(reward_heap, entry)
+        if not reward_heap:
+            del self.groups[times_pulled]
+        return best_action, best_value
+
+    def update(self, action, actions):
+        self.stamps[action] += 1
+        self.stale += 1
+        self.add(action, actions[action])
+
+        # stop old entries from piling up in groups that are rarely looked at
+        if self.stale > self.num_actions:
+            self.rebuild(actions)
@@ -0,0 +1,188 @@
+from array import array
+import struct
+
+# a combined state is (player_moves << 9) | opponent_moves. reading each square as a
+# base 3 digit (0 empty, 1 player, 2 opponent) gives every pair of boards its own
+# index below 3^9, so a value table can be a flat array instead of a dict
+NUM_STATES = 3**9
+
+# base 3 index of each 9-bit board when its squares are all 1s
+BASE3 = [sum(3**j for j in range(9) if (board >> j) & 1) for board in range(512)]
+PLAYER_INDEX = BASE3
+OPPONENT_INDEX = [2 * x for x in BASE3]
+
+# marks slots that have never been given a value
+UNSEEN = float("nan")
+
+
+def state_index(combined_state):
+    return (
+        PLAYER_INDEX[combined_state >> 9] + OPPONENT_INDEX[combined_state & 0b111111111]
+    )
+
+
+def index_state(index):
+    player_state = 0
+    opponent_state = 0
+    for j in range(9):
+        index, digit = divmod(index, 3)
+        if digit == 1:
+            player_state |= 1 << j
+        elif digit == 2:
+            opponent_state |= 1 << j
+    return (player_state << 9) | opponent_state
+
+
+# saved tables start with a fixed size little endian header of a magic string, the
+# format version, flags (bit 0 is symmetric), the number of slots, the learning and
+# exploring rates and the opponent type name. the values follow as float32 by slot,
+# with nan for unseen states, starting at TABLE_OFFSET so they can be memory mapped
+TABLE_MAGIC = b"TTTV"
+TABLE_VERSION = 1
+TABLE_HEADER = struct.Struct("<4sHHIdd16s")
+TABLE_OFFSET = 64
+
+# slot of every state index when each state has its own slot
+IDENTITY_SLOTS = list(range(NUM_STATES))
+
+# built the first time a symmetric table is made, see symmetric_slots
+SYMMETRIC_SLOTS = None
+SYMMETRIC_STATES = None
+
+
+# gives every group of states that are rotations or reflections of each other one
+# shared slot, along with the canonical state stored in each slot
+def symmetric_slots():
+    global SYMMETRIC_SLOTS, SYMMETRIC_STATES
+    if SYMMETRIC_SLOTS is None:
+        from util.board_symmetry import canonical_state
+
+        slots = []
+        states = []
+        canonical_slots = {}
+        for index in range(NUM_STATES):
+            canonical = canonical_state(index_state(index))
+            if canonical not in canonical_slots:
+                canonical_slots[canonical] = len(states)
+                states.append(canonical)
+            slots.append(canonical_slots[canonical])
+        SYMMETRIC_SLOTS = slots
+        SYMMETRIC_STATES = states
+    return SYMMETRIC_SLOTS, SYMMETRIC_STATES
+
+
+class ValueTable:
+    # state values in a preallocated array. slots maps a state_index to the place
+    # in the array holding its value, which is the index itself unless the table is
+    # symmetric. unseen states hold nan, and the order slots were first seen in is
+    # kept so that printing them sorts ties the same way a dict would
+    def __init__(self, symmetric=False, values=None):
+        self.symmetric = symmetric
+        if symmetric:
+            self.slots, self.slot_states = symmetric_slots()
+        else:
+            self.slots, self.slot_states = IDENTITY_SLOTS, None
+        self.order = []
+
+        # values can be handed in, such as a memory mapped table from a file
+        if values is None:
+            self.values = array("d", [UNSEEN]) * (
+                len(self.slot_states) if symmetric else NUM_STATES
+            )
+        else:
+            self.values = values
+            self.sync_order()
+
+    def slot(self, combined_state):
+        return self.slots[state_index(combined_state)]
+
+    def __contains__(self, combined_state):
+        value = self.values[self.slot(combined_state)]
+        return value == value
+
+    def __getitem__(self, combined_state):
+        value = self.values[self.slot(combined_state)]
+        if value != value:
+            raise KeyError(combined_state)
+        return value
+
+    def __setitem__(self, combined_state, value):
+        self.set_slot(self.slot(combined_state), value)
+
+    def set_slot(self, slot, value):
+        if self.values[slot] != self.values[slot]:
+            self.order.append(slot)
+        self.values[slot] = value
+
+    def slot_state(self, slot):
+        return self.slot_states[slot] if self.symmetric else index_state(slot)
+
+    # picks up slots that were written straight into values, in slot order
+    def sync_order(self):
+        seen = set(self.order)
+        self.order += [
+            slot
+            for slot, value in enumerate(self.values)
+            if value == value and slot not in seen
+        ]
+
+    def __len__(self):
+        return len(self.order)
+
+    # number of states the first player moved into, where it has one more move than
+    # the opponent, along with the empty board it starts from. a self play opponent
+    # sharing the table only adds states where both sides have as many moves
+    def count_player_states(self):
+        count = 0
+        for slot in self.order:
+            combined_state = self.slot_state(slot)
+            player_moves = (combined_state >> 9).bit_count()
+            opponent_moves = (combined_state & 0b111111111).bit_count()
+            if player_moves > opponent_moves or combined_state == 0:
+                count += 1
+        return count
+
+    def items(self):
+        return [(self.slot_state(slot), self.values[slot]) for slot in self.order]
+
+
+def save_value_table(states, path, learning_rate=0, exploring_rate=0, opponent=""):
+    header = TABLE_HEADER.pack(
+        TABLE_MAGIC,
+        TABLE_VERSION,
+        1 if states.symmetric else 0,
+        len(states.values),
+        learning_rate,
+        exploring_rate,
+        opponent.encode("ascii"),
+    )
+    with open(path, "wb") as file:
+        file.write(header.ljust(TABLE_OFFSET, b"\0"))
+        file.write(array("f", states.values).tobytes())
+
+
+# memory maps a saved table read only, so any number of processes can share the
+# same pages. writable copies the values into a new array for more training
+def load_value_table(path, writable=False):
+    import numpy as np
+
+    with open(path, "rb") as file:
+        magic, version, flags, num_slots, learning_rate, exploring_rate, opponent = (
+            TABLE_HEADER.unpack(file.read(TABLE_HEADER.size))
+        )
+    if magic != TABLE_MAGIC or version != TABLE_VERSION:
+        raise ValueError(f"Not a value table: {path}")
+
+    values = np.memmap(
+        path, dtype="<f4", mode="r", offset=TABLE_OFFSET, shape=(num_slots,)
+    )
+    if writable:
+        values = array("d", values.astype(np.float64).tobytes())
+
+    header = {
+        "symmetric": bool(flags & 1),
+        "learning_rate": learning_rate,
+        "exploring_rate": exploring_rate,
+        "opponent": opponent.rstrip(b"\0").decode("ascii"),
+    }
+    return ValueTable(header["symmetric"], values), header
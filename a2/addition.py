@@ -1,6 +1,7 @@
 import argparse
 
 from util.addition_world import AdditionWorld
+from util.linear_evaluation import EVALUATION_MODES
 
 
 def main(args):
@@ -8,7 +9,13 @@ def main(args):
     print()
     print("Using Policy Iteration:")
     policy_addition_world = AdditionWorld(
-        args.digits, args.discount, args.accuracy, args.seed, args.force_order
+        args.digits,
+        args.discount,
+        args.accuracy,
+        args.seed,
+        args.force_order,
+        args.evaluation,
+        args.evaluation_sweeps,
     )
     policy_addition_world.perform_policy_iteration()
     policy_addition_world.produce_sum()
@@ -29,6 +36,21 @@ if __name__ == "__main__":
     parser.add_argument("--accuracy", type=float, default=0.001)
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--force_order", action="store_true")
+    parser.add_argument(
+        "--evaluation",
+        type=str,
+        choices=EVALUATION_MODES,
+        default="sweeps",
+        help="Evaluate each policy with sweeps, or solve for its values with a direct or krylov sparse solver",
+    )
+    parser.add_argument(
+        "--evaluation_sweeps",
+        type=int,
+        default=0,
+        help="Stop each policy evaluation after this many sweeps (modified policy iteration), 0 to sweep until accurate",
+    )
 
     args = parser.parse_args()
+    if args.evaluation != "sweeps" and args.evaluation_sweeps:
+        parser.error("--evaluation_sweeps only works with --evaluation sweeps")
     main(args)
@@ -2,6 +2,7 @@ import argparse
 
 from util.interfaces import BellmanData, GridWorldPayload
 from util.grid_world import GridWorld
+from util.linear_evaluation import EVALUATION_MODES
 
 
 def main(args):
@@ -13,8 +14,17 @@ def main(args):
         args.wall_column,
         args.wall_row,
         args.doors,
+        args.evaluation,
+        args.evaluation_sweeps,
     )
-    grid = GridWorld(payload)
+    # the numpy backend builds the grid straight into flat arrays, without a
+    # state object per cell
+    if args.backend == "numpy":
+        from util.array_grid_world import ArrayGridWorld
+
+        grid = ArrayGridWorld(payload)
+    else:
+        grid = GridWorld(payload)
 
     # this creates the states, joins them together in a graph, and defines the various
     # actions that can be taken per state
@@ -25,6 +35,12 @@ def main(args):
     grid.join_states()
     grid.initialize_actions()
 
+    # the numpy backend sweeps the arrays with float64 instead of Decimal
+    if args.backend == "numpy":
+        from util.numpy_grid_world import NumpyGridWorld
+
+        grid = NumpyGridWorld(grid)
+
     # perform the sweeps and the backtracking algorithm until delta is less than or
     # equal to theta
     grid.perform_policy_iteration()
@@ -44,6 +60,29 @@ if __name__ == "__main__":
     parser.add_argument("--wall_column", type=int, default=None)
     parser.add_argument("--wall_row", type=int, default=None)
     parser.add_argument("--doors", type=int, nargs="+", default=[])
+    parser.add_argument(
+        "--backend",
+        type=str,
+        choices=["decimal", "numpy"],
+        default="decimal",
+        help="Sweep the states with Decimal objects or with float64 numpy arrays",
+    )
+
+    parser.add_argument(
+        "--evaluation",
+        type=str,
+        choices=EVALUATION_MODES,
+        default="sweeps",
+        help="Evaluate each policy with sweeps, or solve for its values with a direct or krylov sparse solver",
+    )
+    parser.add_argument(
+        "--evaluation_sweeps",
+        type=int,
+        default=0,
+        help="Stop each policy evaluation after this many sweeps (modified policy iteration), 0 to sweep until accurate",
+    )
 
     args = parser.parse_args()
+    if args.evaluation != "sweeps" and args.evaluation_sweeps:
+        parser.error("--evaluation_sweeps only works with --evaluation sweeps")
     main(args)
@@ -15,11 +15,15 @@ class AdditionWorld:
         accuracy: float,
         seed: int,
         force_order: bool,
+        evaluation: str = "sweeps",
+        evaluation_sweeps: int = 0,
     ):
         self.rng = random.Random(seed)
         self.digits = digits
         self.accuracy = accuracy
         self.discount = discount
+        self.evaluation = evaluation
+        self.evaluation_sweeps = evaluation_sweeps
 
         digit_input = None
         print("would you like to enter custom digits?(Y/N):")
@@ -41,6 +45,8 @@ class AdditionWorld:
         self.i = 0
         self.k = 0
         self.delta = 0
+        # biggest change in either direction in the last sweep
+        self.largest_change = 0
 
     def initialize_states(self):
         n = self.digits + 1
@@ -88,8 +94,15 @@ class AdditionWorld:
         still_pruning = True
         while still_pruning:
             self.i += 1
-            self.reset_states()
+            # modified policy iteration carries the values on to the next policy
+            if not self.evaluation_sweeps or self.i == 1:
+                self.reset_states()
             self.perform_policy_evalutation()
+            # a few sweeps may not have finished evaluating the policy yet, so it
+            # is only greedified once the carried values have settled. the values
+            # can rise after a better policy, so delta alone isn't enough
+            if self.evaluation_sweeps and self.largest_change > self.accuracy:
+                continue
             # greedify the states and check if there has been any change
             # between the number of actions
             still_pruning = self.perform_policy_improvement()
@@ -109,18 +122,58 @@ class AdditionWorld:
         self.error_state.evaluate_policy()
         delta = max(delta, self.error_state.value - self.error_state.new_value)
         # after complete sweep, update the values of all states according to sweep
-        for state in self.states.values():
+        self.largest_change = Decimal(0)
+        for state in list(self.states.values()) + [self.error_state]:
+            self.largest_change = max(
+                self.largest_change, abs(state.new_value - state.value)
+            )
             state.value = state.new_value
-        self.error_state.value = self.error_state.new_value
         return delta
 
     def perform_policy_evalutation(self):
+        if self.evaluation != "sweeps":
+            self.solve_policy_evaluation()
+            return
+
         self.delta = Decimal(0)
         local_k = 0
         while self.delta > self.accuracy or local_k == 0:
             self.delta = self.perform_policy_sweep()
             local_k += 1
             self.k += 1
+            if local_k == self.evaluation_sweeps:
+                break
+
+    # solves for the values of the current policy in one go, see
+    # util.linear_evaluation. the error state comes after the other states and
+    # loops back to itself like ErrorState.evaluate_policy, and terminal states
+    # stay at 0. one sweep from the solved values then sets every action value
+    def solve_policy_evaluation(self):
+        from util.linear_evaluation import solve_policy_values
+
+        states = list(self.states.values()) + [self.error_state]
+        indexes = {id(state): index for index, state in enumerate(states)}
+
+        rows = [len(states) - 1]
+        columns = [len(states) - 1]
+        weights = [float(ErrorState.DISCOUNT)]
+        rewards = [0.0] * len(states)
+        rewards[-1] = float(ErrorState.REWARD)
+        for index, state in enumerate(states[:-1]):
+            if None not in state.sum:
+                continue
+            prob = 1 / len(state.actions)
+            for action in state.actions:
+                rows.append(index)
+                columns.append(indexes[id(action.result_state)])
+                weights.append(prob * self.discount)
+                rewards[index] += prob * action.reward
+
+        values = solve_policy_values(rows, columns, weights, rewards, self.evaluation)
+        for index, state in enumerate(states):
+            state.value = Decimal(repr(float(values[index])))
+        self.delta = self.perform_policy_sweep()
+        self.k += 1
 
     def perform_policy_improvement(self):
         still_pruning = False
@@ -0,0 +1,204 @@
+import numpy as np
+
+from util.interfaces import AdjacentStates, GridWorldPayload
+
+# wall types as stored in the uint8 wall array, indexed by their GridState names
+WALL_STATES = ["None", "COL", "COL_DOOR", "ROW", "ROW_DOOR", "CROSS"]
+NO_WALL, COL, COL_DOOR, ROW, ROW_DOOR, CROSS = range(len(WALL_STATES))
+
+# the actions every non terminal state starts with, in the order GridState adds
+# them, along with the two neighbours beside each action's target in the order
+# GridAction looks at them
+ACTION_SIDES = [
+    (AdjacentStates.TOP, AdjacentStates.TOP_LEFT, AdjacentStates.TOP_RIGHT),
+    (AdjacentStates.BOTTOM, AdjacentStates.BOTTOM_LEFT, AdjacentStates.BOTTOM_RIGHT),
+    (AdjacentStates.RIGHT, AdjacentStates.TOP_RIGHT, AdjacentStates.BOTTOM_RIGHT),
+    (AdjacentStates.LEFT, AdjacentStates.TOP_LEFT, AdjacentStates.BOTTOM_LEFT),
+]
+
+
+class ArrayGridWorld:
+    # the same grid as GridWorld, kept as a few flat arrays instead of a GridState
+    # and four GridActions per cell, so a 1000 x 1000 grid fits in a few hundred
+    # megabytes and builds in seconds:
+    #
+    #   walls       uint8 wall type of every cell (see WALL_STATES)
+    #   terminal    bool, whether each cell is a terminal state
+    #   neighbours  int32 n x 9, the state each AdjacentStates direction leads to,
+    #               or -1 where GridState.neighbours would hold None
+    #   successors  int32 n x 4 x 4, the target, the cell itself and the two states
+    #               beside the target for each action, like GridAction
+    #   actions     bool n x 4, which actions each cell still has
+    #
+    # it is built with the same create_states, join_states and initialize_actions
+    # calls as GridWorld and solved by NumpyGridWorld, which writes the values and
+    # remaining actions back here for print_grid
+    def __init__(self, payload: GridWorldPayload):
+        self.dimension = payload.dimensions
+        self.accuracy = payload.accuracy
+        self.terminal_states = payload.terminal_states
+
+        self.column = payload.column
+        self.row = payload.row
+        self.doors = payload.doors
+
+        self.evaluation = payload.evaluation
+        self.evaluation_sweeps = payload.evaluation_sweeps
+
+        self.size = self.dimension**2
+        self.indexes = np.arange(self.size, dtype=np.int32)
+
+        self.k = 0
+        self.i = 0
+        self.delta = 0
+
+    # GridWorld.determine_wall_state for every cell at once
+    def determine_wall_states(self):
+        i = self.indexes
+        is_door = np.isin(i, self.doors)
+        in_column = np.zeros(self.size, dtype=bool)
+        if self.column is not None:
+            in_column = i % self.dimension == self.column
+        in_row = np.zeros(self.size, dtype=bool)
+        if self.row is not None:
+            # like GridWorld, the wall row is picked out with the column
+            in_row = (i >= self.column * self.dimension) & (
+                i < self.column * self.dimension + self.dimension
+            )
+
+        walls = np.full(self.size, NO_WALL, dtype=np.uint8)
+        walls[in_row] = np.where(is_door[in_row], ROW_DOOR, ROW)
+        walls[in_column] = np.where(is_door[in_column], COL_DOOR, COL)
+        walls[in_column & in_row] = CROSS
+        return walls
+
+    def create_states(self, bellman_data):
+        self.bellman_data = bellman_data
+        self.walls = self.determine_wall_states()
+        self.terminal = np.isin(self.indexes, self.terminal_states)
+        self.initial_values = np.where(
+            self.terminal, float(bellman_data.terminal_reward), 0.0
+        )
+        self.values = self.initial_values.copy()
+
+    # GridWorld.join_states one direction at a time across every open cell
+    def join_states(self):
+        i = self.indexes
+        is_left = i % self.dimension == 0
+        is_right = i % self.dimension == self.dimension - 1
+        row_offsets = {"TOP": -self.dimension, "BOTTOM": self.dimension}
+        column_offsets = {"LEFT": -1, "RIGHT": 1}
+
+        self.neighbours = np.full((self.size, 9), -1, dtype=np.int32)
+        for adjacent_state in AdjacentStates:
+            name = adjacent_state.name
+            offset = sum(
+                row_offset for side, row_offset in row_offsets.items() if side in name
+            ) + sum(
+                column_offset
+                for side, column_offset in column_offsets.items()
+                if side in name
+            )
+            index = i + offset
+
+            # walls and doors aren't joined to anything, and there is nothing off
+            # the edges of the grid
+            joined = (self.walls == NO_WALL) & (0 <= index) & (index < self.size)
+            if "LEFT" in name:
+                joined &= ~is_left
+            if "RIGHT" in name:
+                joined &= ~is_right
+
+            index = index[joined]
+            wall = self.walls[index]
+            # a door re-routes to the state on its opposite side. GridWorld indexes
+            # its state list with these, so a negative index wraps around and one
+            # past the end of the grid raises an IndexError the same way
+            col_door = index - 1 if "LEFT" in name else index + 1
+            row_door = (
+                index - self.dimension if "TOP" in name else index + self.dimension
+            )
+            is_door = (wall == COL_DOOR) | (wall == ROW_DOOR)
+            door = np.where(wall == COL_DOOR, col_door, row_door)
+            if (door[is_door] >= self.size).any():
+                raise IndexError("list index out of range")
+            door = np.where(door < 0, door + self.size, door)
+            neighbour = np.where(wall == NO_WALL, index, -1)
+            neighbour = np.where(is_door, door, neighbour)
+            self.neighbours[joined, adjacent_state.value] = neighbour
+
+    # GridState.initialize_actions and GridAction for every cell. a missing target
+    # means staying put, and missing states beside the target are replaced by the
+    # target
+    def initialize_actions(self):
+        i = self.indexes
+        self.successors = np.empty((self.size, len(ACTION_SIDES), 4), dtype=np.int32)
+        for a, (action, first_side, second_side) in enumerate(ACTION_SIDES):
+            target = self.neighbours[:, action.value]
+            target = np.where(target < 0, i, target)
+            first = self.neighbours[:, first_side.value]
+            second = self.neighbours[:, second_side.value]
+            self.successors[:, a, 0] = target
+            self.successors[:, a, 1] = i
+            self.successors[:, a, 2] = np.where(
+                first >= 0, first, np.where(second >= 0, second, target)
+            )
+            self.successors[:, a, 3] = np.where(
+                (first >= 0) & (second >= 0), second, target
+            )
+
+        # no need for actions in the terminal states
+        self.actions = np.repeat(~self.terminal[:, None], len(ACTION_SIDES), axis=1)
+
+    # the same printout as GridWorld.print_grid
+    def print_grid(self):
+        # terminal states are never shown as walls, like GridState
+        walls = np.where(self.terminal, NO_WALL, self.walls)
+
+        value_cells = []
+        for index in range(self.size):
+            wall = walls[index]
+            if wall == COL_DOOR or wall == ROW_DOOR:
+                value_cells.append("DOOR")
+            elif wall != NO_WALL:
+                value_cells.append("WALL")
+            else:
+                indicator = "**" if self.terminal[index] else str(index)
+                value_cells.append(f"{indicator}: {float(self.values[index]):.2f}")
+
+        value_cell_width = max(len(cell) for cell in value_cells)
+
+        print(f"GRID {self.size}      k = {self.k}      i = {self.i}")
+        print("-" * 25)
+        print()
+        print("VALUES:")
+        for i, value_cell in enumerate(value_cells):
+            if i % self.dimension == 0 and i > 0:
+                print()
+            print(f"{value_cell:>{value_cell_width}}", end=" ")
+        print()
+        print("ACTIONS")
+        action_names = [action.name[0] for action, _, _ in ACTION_SIDES]
+        for i in range(self.size):
+            if i % self.dimension == 0 and i > 0:
+                print()
+
+            wall = walls[i]
+            if wall == CROSS:
+                print("||", end="=")
+            elif wall == COL:
+                print("||", end=" ")
+            elif wall == ROW:
+                print("======", end="=")
+            elif wall == COL_DOOR:
+                print("  ", end=" ")
+            elif wall == ROW_DOOR:
+                print("|    |", end="=")
+            elif self.terminal[i]:
+                print("[TERM]", end=" ")
+            else:
+                actions_str = "".join(
+                    name for name, kept in zip(action_names, self.actions[i]) if kept
+                )
+                print(f"[{actions_str:4}]", end=" ")
+        print()
@@ -2,15 +2,18 @@ from decimal import Decimal
 
 
 class ErrorState:
+    # no matter what agent does in this state, the answer is wrong and reward is -1
+    REWARD = Decimal("-1")
+    DISCOUNT = Decimal(".9")
+
     def __init__(self):
         self.value = 0
         self.new_value = 0
         self.sum = "Error"
 
     def evaluate_policy(self):
-        # no matter what agent does in this state, the answer is wrong and reward is -1
-        r = Decimal(str("-1"))
-        d = Decimal(str(".9"))
+        r = self.REWARD
+        d = self.DISCOUNT
         v = Decimal(str(self.value))
         p = Decimal(str("1"))
         result = p * (r + d * v)
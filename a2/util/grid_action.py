@@ -1,5 +1,5 @@
 from decimal import Decimal
-from util.interfaces import AdjacentStates
+from util.interfaces import ActionTransitions, AdjacentStates
 
 
 class GridAction:
@@ -10,6 +10,7 @@ class GridAction:
         self.adjacent_states = self.get_adjacent_states(neighbours)
         self.bellman_data = bellman_data
         self.value = 0
+        self.transitions = None
 
     # if target is None, this action will result in agent returning to
     # original state
@@ -54,39 +55,48 @@ class GridAction:
             options.append(self.target)
         return options
 
-    def calculate_action_value(self, prob):
-        # add target and self values
-        target_value = self.state_reward_summand(self.bellman_data.p_one, self.target)
-        self_value = self.state_reward_summand(self.bellman_data.p_two, self.state)
-
-        # add target adjacent state values
-        adjacent_value = 0
+    # each result of the action adds prob * (reward + discount * value), so the
+    # reward parts are summed and the discount is multiplied into each prob once,
+    # leaving a multiply and an add per result for every sweep
+    def compile_transitions(self):
+        results = [
+            (self.bellman_data.p_one, self.target),
+            (self.bellman_data.p_two, self.state),
+        ]
         d = len(self.adjacent_states)
         if d > 0:
             p_three = (1 - self.bellman_data.p_one - self.bellman_data.p_two) / d
             for adjacent_state in self.adjacent_states:
-                adjacent_value += self.state_reward_summand(p_three, adjacent_state)
+                results.append((p_three, adjacent_state))
+
+        discount = Decimal(str(self.bellman_data.discount))
+        reward = Decimal(0)
+        successors = []
+        weights = []
+        for prob, state in results:
+            p = Decimal(str(prob))
+            r = Decimal(
+                str(
+                    self.bellman_data.reward
+                    if not state.terminal_state
+                    else self.bellman_data.terminal_reward
+                )
+            )
+            reward += p * r
+            successors.append(state.index)
+            weights.append(p * discount)
+        self.transitions = ActionTransitions(reward, successors, weights)
 
-        summation = target_value + self_value + adjacent_value
+    # values holds the value of every state by index, from before the sweep
+    def calculate_action_value(self, prob, values):
+        summation = self.transitions.reward
+        for successor, weight in zip(
+            self.transitions.successors, self.transitions.weights
+        ):
+            summation += weight * values[successor]
         self.value = Decimal(prob) * summation
         return self.value
 
-    # calculate the prob of state result * reward plus discount times previous value of
-    # result state
-    def state_reward_summand(self, prob, state):
-        r = Decimal(
-            str(
-                self.bellman_data.reward
-                if not state.terminal_state
-                else self.bellman_data.terminal_reward
-            )
-        )
-        d = Decimal(str(self.bellman_data.discount))
-        v = Decimal(str(state.value))
-        p = Decimal(str(prob))
-        result = p * (r + d * v)
-        return result
-
     def print_action(self):
         print(f"{self.action.name}")
         print("-" * 10)
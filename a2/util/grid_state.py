@@ -51,7 +51,7 @@ class GridState:
         )
 
     # calculate (v)k + 1 for current state and store value in new_value
-    def evaluate_policy(self):
+    def evaluate_policy(self, values):
         if self.terminal_state:
             # we are in the terminal state, no need to further iterate
             return
@@ -60,7 +60,7 @@ class GridState:
         total_value = 0
         prob = Decimal(1 / len(self.actions))
         for action in self.actions:
-            total_value += action.calculate_action_value(prob)
+            total_value += action.calculate_action_value(prob, values)
 
         self.new_value = total_value
 
@@ -1,4 +1,5 @@
 from decimal import Decimal
+import heapq
 
 from util.interfaces import AdjacentStates, GridWorldPayload
 from util.grid_state import GridState
@@ -14,12 +15,17 @@ class GridWorld:
         self.row = payload.row
         self.doors = payload.doors
 
+        self.evaluation = payload.evaluation
+        self.evaluation_sweeps = payload.evaluation_sweeps
+
         self.size = self.dimension**2
 
         self.states = []
         self.k = 0
         self.i = 0
         self.delta = 0
+        # biggest change in either direction in the last sweep
+        self.largest_change = 0
 
     def determine_wall_state(self, i):
         if (
@@ -121,13 +127,22 @@ class GridWorld:
     def initialize_actions(self):
         for state in self.states:
             state.initialize_actions()
+            for action in state.actions:
+                action.compile_transitions()
 
     def perform_policy_iteration(self):
         still_pruning = True
         while still_pruning:
             self.i += 1
-            self.reset_states()
+            # modified policy iteration carries the values on to the next policy
+            if not self.evaluation_sweeps or self.i == 1:
+                self.reset_states()
             self.perform_policy_evaluation()
+            # a few sweeps may not have finished evaluating the policy yet, so it
+            # is only greedified once the carried values have settled. the values
+            # can rise after a better policy, so delta alone isn't enough
+            if self.evaluation_sweeps and self.largest_change > self.accuracy:
+                continue
             still_pruning = self.perform_policy_improvement()
 
     def perform_value_iteration(self):
@@ -137,6 +152,89 @@ class GridWorld:
             self.k += 1
             self.perform_policy_improvement()
 
+    # value iteration one state at a time, updating values in place. the state whose
+    # value looks furthest from its backup goes first, and after a state changes
+    # only the states that can move into it are queued again, with a priority of
+    # how much the change can move their own value. this stops once no queued
+    # change is bigger than the accuracy, then keeps the greedy actions.
+    #
+    # the other states start at the value of never reaching a terminal state, which
+    # is already their backup unless a terminal state is in reach. so only the
+    # states next to a terminal state are queued at first, and the values spread
+    # out from there instead of every state being swept over and over.
+    #
+    # k counts single state backups instead of sweeps. terminal states start at 0,
+    # which is where a sweep leaves them
+    def perform_prioritized_value_iteration(self):
+        predecessors = self.get_predecessors()
+        bellman_data = self.states[0].bellman_data
+        if bellman_data.discount < 1:
+            start_value = Decimal(str(bellman_data.reward)) / (
+                1 - Decimal(str(bellman_data.discount))
+            )
+        else:
+            start_value = Decimal(0)
+        values = [
+            Decimal(0) if state.terminal_state else start_value for state in self.states
+        ]
+
+        queue = []
+        queued = {}
+        for state in self.states:
+            if state.terminal_state:
+                continue
+            priority = abs(self.backup_state(state, values) - values[state.index])
+            if priority > self.accuracy:
+                queued[state.index] = priority
+                queue.append((-priority, state.index))
+        heapq.heapify(queue)
+
+        while queue:
+            priority, index = heapq.heappop(queue)
+            if queued.get(index) != -priority:
+                # a higher priority for this state was queued after this one
+                continue
+            del queued[index]
+
+            new_value = self.backup_state(self.states[index], values)
+            change = abs(new_value - values[index])
+            values[index] = new_value
+            for predecessor, weight in predecessors[index]:
+                priority = weight * change
+                if priority > self.accuracy and priority > queued.get(predecessor, 0):
+                    queued[predecessor] = priority
+                    heapq.heappush(queue, (-priority, predecessor))
+
+        self.i += 1
+        for state in self.states:
+            state.value = values[state.index]
+            if state.actions:
+                prob = Decimal(1 / len(state.actions))
+                for action in state.actions:
+                    action.calculate_action_value(prob, values)
+        self.perform_policy_improvement()
+
+    # best action value of a state, counted as one backup
+    def backup_state(self, state, values):
+        self.k += 1
+        return max(action.calculate_action_value(1, values) for action in state.actions)
+
+    # for every state, the states with an action that can end up in it, along with
+    # the largest discounted chance of any one of those actions getting there
+    def get_predecessors(self):
+        predecessors = [{} for _ in self.states]
+        for state in self.states:
+            for action in state.actions:
+                chances = {}
+                for successor, weight in zip(
+                    action.transitions.successors, action.transitions.weights
+                ):
+                    chances[successor] = chances.get(successor, 0) + weight
+                for successor, chance in chances.items():
+                    if chance > predecessors[successor].get(state.index, 0):
+                        predecessors[successor][state.index] = chance
+        return [list(states.items()) for states in predecessors]
+
     # print the grid with values and policies
     def print_grid(self):
         value_cells = []
@@ -192,19 +290,29 @@ class GridWorld:
     # make one policy sweep through all states and record delta
     def perform_policy_sweep(self):
         delta = Decimal(0)
+        # the actions read the old values by state index from one list
+        values = [state.value for state in self.states]
         for state in self.states:
             # calculate the new values
-            state.evaluate_policy()
+            state.evaluate_policy(values)
             delta = max(delta, state.value - state.new_value)
+        self.largest_change = Decimal(0)
         for state in self.states:
             # now we update the value of states with new values
             # must do this seperately so that we still have the old
             # values when doing the calculations
+            self.largest_change = max(
+                self.largest_change, abs(state.new_value - state.value)
+            )
             state.value = state.new_value
         return delta
 
     # find stable policy as part of policy iteration
     def perform_policy_evaluation(self):
+        if self.evaluation != "sweeps":
+            self.solve_policy_evaluation()
+            return
+
         # initialize the state actions using p_one, p_two, reward and discount
         self.delta = Decimal(0)
         local_k = 0
@@ -212,6 +320,37 @@ class GridWorld:
             self.delta = self.perform_policy_sweep()
             local_k += 1
             self.k += 1
+            if local_k == self.evaluation_sweeps:
+                break
+
+    # solves for the values of the current policy in one go, then does one sweep
+    # from them so every action value is up to date for the policy improvement.
+    # terminal states are left at 0, where a sweep leaves them
+    def solve_policy_evaluation(self):
+        from util.linear_evaluation import solve_policy_values
+
+        rows = []
+        columns = []
+        weights = []
+        rewards = [0.0] * self.size
+        for state in self.states:
+            if state.terminal_state:
+                continue
+            prob = 1 / len(state.actions)
+            for action in state.actions:
+                rewards[state.index] += prob * float(action.transitions.reward)
+                for successor, weight in zip(
+                    action.transitions.successors, action.transitions.weights
+                ):
+                    rows.append(state.index)
+                    columns.append(successor)
+                    weights.append(prob * float(weight))
+
+        values = solve_policy_values(rows, columns, weights, rewards, self.evaluation)
+        for state in self.states:
+            state.value = Decimal(repr(float(values[state.index])))
+        self.delta = self.perform_policy_sweep()
+        self.k += 1
 
     # use greedy algorithm to choose optimal actions based on policy
     # if no actions are pruned then policy is stable
@@ -1,3 +1,4 @@
+from decimal import Decimal
 from enum import Enum
 from typing import List, NamedTuple
 
@@ -11,6 +12,10 @@ class GridWorldPayload(NamedTuple):
     column: int
     row: int
     doors: List[int]
+    # how each policy is evaluated in policy iteration, see util.linear_evaluation.
+    # a number of sweeps above 0 stops each evaluation after that many sweeps
+    evaluation: str = "sweeps"
+    evaluation_sweeps: int = 0
 
 
 class BellmanData(NamedTuple):
@@ -21,6 +26,14 @@ class BellmanData(NamedTuple):
     terminal_reward: float
 
 
+# everything a grid action's backup needs that doesn't change between sweeps. the
+# backup of the action is reward + sum(weights[i] * values[successors[i]])
+class ActionTransitions(NamedTuple):
+    reward: Decimal
+    successors: List[int]
+    weights: List[Decimal]
+
+
 class AdjacentStates(Enum):
     TOP_LEFT = 0
     TOP = 1
@@ -0,0 +1,29 @@
+# ways a fixed policy can be evaluated. "sweeps" repeats policy sweeps until delta
+# is small enough, while "direct" and "krylov" solve for the values in one go
+EVALUATION_MODES = ["sweeps", "direct", "krylov"]
+
+
+# values of a fixed policy, solving (I - W)v = r where W[s][t] is the policy's
+# discounted chance of going from state s to state t and r[s] is its expected
+# reward in s. entries given more than once are added together. "direct" factors
+# the sparse system, while "krylov" uses bicgstab, which needs far less memory on
+# big worlds. scipy is only needed for these modes so it is imported here
+def solve_policy_values(rows, columns, weights, rewards, method="direct"):
+    import numpy as np
+    from scipy.sparse import csr_matrix, identity
+    from scipy.sparse.linalg import bicgstab, spsolve
+
+    size = len(rewards)
+    discounted_chances = csr_matrix((weights, (rows, columns)), shape=(size, size))
+    system = identity(size, format="csr") - discounted_chances
+    rewards = np.asarray(rewards, dtype=float)
+
+    if method == "direct":
+        return spsolve(system.tocsc(), rewards)
+    elif method == "krylov":
+        values, info = bicgstab(system, rewards, rtol=1e-12, atol=0)
+        if info != 0:
+            raise RuntimeError(f"bicgstab didn't converge (info={info})")
+        return values
+    else:
+        raise ValueError(f"Invalid solve method: {method}")
@@ -0,0 +1,192 @@
+import numpy as np
+
+from util.array_grid_world import ACTION_SIDES, ArrayGridWorld
+
+# the actions every non terminal state starts with, in the order GridState adds them
+ACTIONS = [action for action, _, _ in ACTION_SIDES]
+
+# the greedy comparisons round to the same precision as GridState.greedify
+GREEDY_DECIMALS = 11
+
+
+class NumpyGridWorld:
+    # the same policy and value iteration as GridWorld, but with float64 arrays
+    # instead of Decimal values on every state. the state and action graph is
+    # compiled once: every action has four results (the target, staying put and
+    # the two states beside the target), so the sparse transitions are an
+    # n x 4 x 4 array of successor indexes with one probability per result, and
+    # a whole sweep is one gather and a few sums.
+    #
+    # the grid is either a GridWorld, whose states and actions are compiled into
+    # arrays here, or an ArrayGridWorld that already holds them. the grid is also
+    # used to print the results, which are copied back onto it first
+    def __init__(self, grid):
+        self.grid = grid
+        self.accuracy = grid.accuracy
+        self.evaluation = grid.evaluation
+        self.evaluation_sweeps = grid.evaluation_sweeps
+
+        if isinstance(grid, ArrayGridWorld):
+            bellman_data = grid.bellman_data
+            self.successors = grid.successors
+            self.active = grid.actions.copy()
+            self.terminal = grid.terminal
+            self.initial_values = grid.initial_values
+        else:
+            bellman_data = grid.states[0].bellman_data
+            self.successors, self.active, self.terminal, self.initial_values = (
+                compile_grid_states(grid)
+            )
+        self.size = len(self.terminal)
+
+        self.discount = bellman_data.discount
+        p_three = (1 - bellman_data.p_one - bellman_data.p_two) / 2
+        self.probabilities = np.array(
+            [bellman_data.p_one, bellman_data.p_two, p_three, p_three]
+        )
+
+        # the reward part of each action only depends on where it can land, so it
+        # is summed once here
+        rewards = np.where(
+            self.terminal, bellman_data.terminal_reward, bellman_data.reward
+        )
+        self.expected_rewards = rewards[self.successors] @ self.probabilities
+
+        self.values = self.initial_values.copy()
+        self.action_values = np.zeros((self.size, len(ACTIONS)))
+        self.k = 0
+        self.i = 0
+        self.delta = 0
+        self.largest_change = 0
+
+    # value of every action from every state, weighted by the chance of the state's
+    # policy picking it like GridAction.calculate_action_value
+    def calculate_action_values(self):
+        q = self.expected_rewards + self.discount * (
+            self.values[self.successors] @ self.probabilities
+        )
+        counts = self.active.sum(axis=1)
+        prob = 1 / np.maximum(counts, 1)
+        self.action_values = np.where(self.active, q * prob[:, None], 0)
+        return self.action_values
+
+    # one synchronous sweep over every state. terminal states have no actions, so
+    # like GridState.evaluate_policy their new value is 0
+    def perform_policy_sweep(self):
+        new_values = self.calculate_action_values().sum(axis=1)
+        new_values[self.terminal] = 0
+        delta = max(0, (self.values - new_values).max())
+        self.largest_change = np.abs(new_values - self.values).max()
+        self.values = new_values
+        return delta
+
+    def perform_policy_evaluation(self):
+        if self.evaluation != "sweeps":
+            self.solve_policy_evaluation()
+            return
+
+        self.delta = 0
+        local_k = 0
+        while self.delta > self.accuracy or local_k == 0:
+            self.delta = self.perform_policy_sweep()
+            local_k += 1
+            self.k += 1
+            if local_k == self.evaluation_sweeps:
+                break
+
+    # like GridWorld.solve_policy_evaluation, with the policy's transitions taken
+    # straight from the successor array
+    def solve_policy_evaluation(self):
+        from util.linear_evaluation import solve_policy_values
+
+        counts = self.active.sum(axis=1)
+        prob = np.where(self.active, 1 / np.maximum(counts, 1)[:, None], 0)
+        weights = prob[:, :, None] * self.discount * self.probabilities
+        rows = np.broadcast_to(
+            np.arange(self.size)[:, None, None], self.successors.shape
+        )
+        taken = np.broadcast_to(self.active[:, :, None], self.successors.shape)
+
+        self.values = solve_policy_values(
+            rows[taken],
+            self.successors[taken],
+            weights[taken],
+            (prob * self.expected_rewards).sum(axis=1),
+            self.evaluation,
+        )
+        self.delta = self.perform_policy_sweep()
+        self.k += 1
+
+    # keeps only the best actions of each state, using the action values of the
+    # last sweep
+    def perform_policy_improvement(self):
+        rounded = np.round(self.action_values, GREEDY_DECIMALS)
+        rounded[~self.active] = -np.inf
+        best = self.active & (rounded == rounded.max(axis=1, keepdims=True))
+        still_pruning = bool((best != self.active).any())
+        self.active = best
+        return still_pruning
+
+    def perform_policy_iteration(self):
+        still_pruning = True
+        while still_pruning:
+            self.i += 1
+            if not self.evaluation_sweeps or self.i == 1:
+                self.values = self.initial_values.copy()
+            self.perform_policy_evaluation()
+            # the carried values are only greedified once they have settled, in
+            # either direction, like GridWorld.perform_policy_iteration
+            if self.evaluation_sweeps and self.largest_change > self.accuracy:
+                continue
+            still_pruning = self.perform_policy_improvement()
+
+    def perform_value_iteration(self):
+        while self.delta > self.accuracy or self.k == 0:
+            self.i += 1
+            self.delta = self.perform_policy_sweep()
+            self.k += 1
+            self.perform_policy_improvement()
+
+    # copies the values, remaining actions and counters back onto the grid
+    def update_grid(self):
+        if isinstance(self.grid, ArrayGridWorld):
+            self.grid.values = self.values
+            self.grid.actions = self.active
+        else:
+            for state in self.grid.states:
+                state.value = self.values[state.index]
+                state.actions = [
+                    action
+                    for action in state.actions
+                    if self.active[state.index, ACTIONS.index(action.action)]
+                ]
+        self.grid.k = self.k
+        self.grid.i = self.i
+        self.grid.delta = self.delta
+
+    def print_grid(self):
+        self.update_grid()
+        self.grid.print_grid()
+
+
+# the successor index of every result of every action, which actions each state
+# has, which states are terminal and the starting values, from a GridWorld's
+# states and actions
+def compile_grid_states(grid):
+    size = len(grid.states)
+    successors = np.zeros((size, len(ACTIONS), 4), dtype=np.int32)
+    active = np.zeros((size, len(ACTIONS)), dtype=bool)
+    terminal = np.zeros(size, dtype=bool)
+    initial_values = np.zeros(size)
+
+    for state in grid.states:
+        terminal[state.index] = state.terminal_state
+        initial_values[state.index] = float(state.initial_value)
+        for action in state.actions:
+            a = ACTIONS.index(action.action)
+            active[state.index, a] = True
+            successors[state.index, a] = [
+                action.target.index,
+                action.state.index,
+            ] + [adjacent.index for adjacent in action.adjacent_states]
+    return successors, active, terminal, initial_values
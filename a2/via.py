@@ -14,7 +14,14 @@ def main(args):
         args.wall_row,
         args.doors,
     )
-    grid = GridWorld(payload)
+    # the numpy backend builds the grid straight into flat arrays, without a
+    # state object per cell
+    if args.backend == "numpy":
+        from util.array_grid_world import ArrayGridWorld
+
+        grid = ArrayGridWorld(payload)
+    else:
+        grid = GridWorld(payload)
 
     # this creates the states, joins them together in a graph, and defines the various
     # actions that can be taken per state
@@ -25,9 +32,18 @@ def main(args):
     grid.join_states()
     grid.initialize_actions()
 
+    # the numpy backend sweeps the arrays with float64 instead of Decimal
+    if args.backend == "numpy":
+        from util.numpy_grid_world import NumpyGridWorld
+
+        grid = NumpyGridWorld(grid)
+
     # perform the sweeps and the backtracking algorithm until delta is less than or
     # equal to theta
-    grid.perform_value_iteration()
+    if args.prioritized:
+        grid.perform_prioritized_value_iteration()
+    else:
+        grid.perform_value_iteration()
     grid.print_grid()
 
 
@@ -44,6 +60,21 @@ if __name__ == "__main__":
     parser.add_argument("--wall_column", type=int, default=None)
     parser.add_argument("--wall_row", type=int, default=None)
     parser.add_argument("--doors", type=int, nargs="+", default=[])
+    parser.add_argument(
+        "--backend",
+        type=str,
+        choices=["decimal", "numpy"],
+        default="decimal",
+        help="Sweep the states with Decimal objects or with float64 numpy arrays",
+    )
+
+    parser.add_argument(
+        "--prioritized",
+        action="store_true",
+        help="Back up one state at a time, in place, in order of how much it will change",
+    )
 
     args = parser.parse_args()
+    if args.prioritized and args.backend != "decimal":
+        parser.error("--prioritized only works with the decimal backend")
     main(args)